@@ -2,6 +2,7 @@
 Configuration management for CV Mailer application.
 """
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 from typing import Optional
@@ -9,8 +10,15 @@ from typing import Optional
 # Load environment variables
 load_dotenv()
 
-class Config:
-    """Application configuration."""
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    """
+    Application configuration.
+    
+    Values are read from the environment once at import time. The instance is
+    frozen and slotted, so settings can't be reassigned at runtime and a
+    misspelled attribute raises instead of silently returning a default.
+    """
     
     # Google API
     GOOGLE_CREDENTIALS_FILE: str = os.getenv("GOOGLE_CREDENTIALS_FILE", "credentials.json")
@@ -39,6 +47,8 @@ class Config:
     EMAIL_DELAY_MIN: float = float(os.getenv("EMAIL_DELAY_MIN", "0.1"))
     EMAIL_DELAY_MAX: float = float(os.getenv("EMAIL_DELAY_MAX", "0.5"))
     DAILY_EMAIL_LIMIT: int = int(os.getenv("DAILY_EMAIL_LIMIT", "50"))
+    # Number of emails sent concurrently
+    EMAIL_SEND_WORKERS: int = int(os.getenv("EMAIL_SEND_WORKERS", "4"))
     
     # Follow-up
     FOLLOW_UP_DAYS: int = int(os.getenv("FOLLOW_UP_DAYS", "7"))
@@ -47,26 +57,31 @@ class Config:
     # Database
     DATABASE_PATH: str = os.getenv("DATABASE_PATH", "cv_mailer.db")
     
+    # Email templates
+    TEMPLATE_CACHE_DIR: str = os.getenv("TEMPLATE_CACHE_DIR", ".jinja_cache")  # Compiled template cache
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", "cv_mailer.log")
     
-    @classmethod
-    def validate(cls) -> list[str]:
+    def validate(self) -> list[str]:
         """Validate configuration and return list of errors."""
         errors = []
         
-        if not cls.SPREADSHEET_ID:
+        if not self.SPREADSHEET_ID:
             errors.append("SPREADSHEET_ID is required")
         
-        if not cls.GMAIL_USER:
+        if not self.GMAIL_USER:
             errors.append("GMAIL_USER is required")
         
-        if not cls.RESUME_FILE_PATH and not cls.RESUME_DRIVE_LINK:
+        if not self.RESUME_FILE_PATH and not self.RESUME_DRIVE_LINK:
             errors.append("Either RESUME_FILE_PATH or RESUME_DRIVE_LINK must be set")
         
-        if not Path(cls.GOOGLE_CREDENTIALS_FILE).exists():
-            errors.append(f"Google credentials file not found: {cls.GOOGLE_CREDENTIALS_FILE}")
+        if not Path(self.GOOGLE_CREDENTIALS_FILE).exists():
+            errors.append(f"Google credentials file not found: {self.GOOGLE_CREDENTIALS_FILE}")
         
         return errors
 
+
+# Application-wide configuration singleton
+Config = AppConfig()
@@ -2,17 +2,60 @@
 Email template system for first contact and follow-up emails.
 """
 import logging
-from jinja2 import Template
+import re
+from pathlib import Path
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache, Template, select_autoescape
 from typing import Dict, Optional
 from datetime import datetime
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Compiled template bytecode is persisted on disk so later runs skip parsing
+_BYTECODE_CACHE_DIR = Path(Config.TEMPLATE_CACHE_DIR)
+_BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+_BYTECODE_CACHE = FileSystemBytecodeCache(directory=str(_BYTECODE_CACHE_DIR))
+
+# Shared Jinja environment for the HTML bodies. Templates are compiled once at import time and
+# reused for every render instead of being re-parsed per email.
+_ENV = Environment(
+    loader=DictLoader({}),
+    autoescape=select_autoescape(['html']),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    bytecode_cache=_BYTECODE_CACHE,
+)
+
+# Sender/signature values never change during a run, so they are set once as
+# environment globals instead of being rebuilt into every render context
+_ENV.globals.update(
+    sender_name=Config.SENDER_NAME,
+    linkedin_profile=Config.LINKEDIN_PROFILE,
+    contact_information=Config.CONTACT_INFORMATION,
+)
+
+
+# Line breaks plus the indentation that follows them. HTML renders any whitespace run as a
+# single space, so collapsing these to a bare newline leaves the email looking the same
+_INDENT_RE = re.compile(r'\n\s+')
+
+
+def _register(env: Environment, name: str, source: str) -> Template:
+    """
+    Register a template source under a stable name and return it compiled.
+    
+    Source indentation is dropped first, which shrinks every rendered (and base64-encoded)
+    message without changing how it displays.
+    """
+    env.loader.mapping[name] = _INDENT_RE.sub('\n', source).strip()
+    return env.get_template(name)
+
+
 class EmailTemplate:
     """Email template manager."""
     
-    FIRST_CONTACT_SUBJECT = "Application: {{ position }} - {{ company_name }}"
+    # Subjects are plain str.format strings; Jinja is only used for the HTML bodies
+    FIRST_CONTACT_SUBJECT = "Application: {position} - {company_name}"
     
     FIRST_CONTACT_TEMPLATE = """
         <!DOCTYPE html>
@@ -69,7 +112,7 @@ class EmailTemplate:
         </html>
     """
 
-    FOLLOW_UP_SUBJECT = "Following up: {{ position }} - {{ company_name }}"
+    FOLLOW_UP_SUBJECT = "Following up: {position} - {company_name}"
     
     FOLLOW_UP_TEMPLATE = """
         <!DOCTYPE html>
@@ -105,6 +148,10 @@ class EmailTemplate:
         </html>
     """
     
+    # Precompiled templates
+    _FIRST_CONTACT_TMPL = _register(_ENV, 'first_contact.html', FIRST_CONTACT_TEMPLATE)
+    _FOLLOW_UP_TMPL = _register(_ENV, 'follow_up.html', FOLLOW_UP_TEMPLATE)
+    
     @classmethod
     def render_first_contact(
         cls,
@@ -124,9 +171,6 @@ class EmailTemplate:
         Returns:
             Tuple of (subject, body)
         """
-        template = Template(cls.FIRST_CONTACT_TEMPLATE)
-        subject_template = Template(cls.FIRST_CONTACT_SUBJECT)
-        
         context = {
             'recruiter_name': recruiter_name,
             'company_name': company_name,
@@ -134,13 +178,10 @@ class EmailTemplate:
             'location': location,
             'job_posting_url': job_posting_url,
             'custom_message': custom_message,
-            'sender_name': Config.SENDER_NAME,
-            'linkedin_profile': getattr(Config, "LINKEDIN_PROFILE", None),
-            'contact_information': getattr(Config, "CONTACT_INFORMATION", None)
         }
         
-        subject = subject_template.render(**context)
-        body = template.render(**context)
+        subject = cls.FIRST_CONTACT_SUBJECT.format(position=position, company_name=company_name)
+        body = cls._FIRST_CONTACT_TMPL.render(context)
         
         return subject, body
     
@@ -159,21 +200,15 @@ class EmailTemplate:
         Returns:
             Tuple of (subject, body)
         """
-        template = Template(cls.FOLLOW_UP_TEMPLATE)
-        subject_template = Template(cls.FOLLOW_UP_SUBJECT)
-        
         context = {
             'recruiter_name': recruiter_name,
             'company_name': company_name,
             'position': position,
             'location': location,
-            'sender_name': Config.SENDER_NAME,
-            'linkedin_profile': getattr(Config, "LINKEDIN_PROFILE", None),
-            'contact_information': getattr(Config, "CONTACT_INFORMATION", None)
         }
         
-        subject = subject_template.render(**context)
-        body = template.render(**context)
+        subject = cls.FOLLOW_UP_SUBJECT.format(position=position, company_name=company_name)
+        body = cls._FOLLOW_UP_TMPL.render(context)
         
         return subject, body
     
@@ -3,28 +3,114 @@ Gmail integration for sending emails with rate limiting and resume attachments.
 """
 import logging
 import base64
+import functools
+import io
 import time
 import random
+import re
+import threading
 import mimetypes
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
+from email.generator import BytesGenerator
 from pathlib import Path
-from typing import Optional, List
-from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Tuple
+from datetime import date, datetime, timedelta, timezone
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, Resource
 from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaIoBaseUpload
+import httplib2
 import pickle
 import os
+from sqlalchemy import delete, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from config import Config
 from models import DailyEmailStats, get_session
 
 logger = logging.getLogger(__name__)
 
+# Where to inject the resume drive link: before the first </div>, else </body>, else at the end
+_TAIL_RE = re.compile(r'</div>|</body>|\Z')
+
+
+@functools.lru_cache(maxsize=None)
+def _build_service(scopes: tuple) -> Tuple[Resource, Credentials]:
+    """
+    Load credentials and build the Gmail service.
+    
+    Cached so every GmailSender in this process shares one authenticated
+    service and the token is only loaded/refreshed once.
+    
+    Returns:
+        Tuple of (service, credentials); the credentials authorize per-thread transports
+    """
+    creds = None
+    token_file = "gmail_token.json"
+    legacy_token_file = "gmail_token.pickle"  # Written by older versions
+    
+    # Try to load existing token
+    if os.path.exists(token_file):
+        creds = Credentials.from_authorized_user_file(token_file, list(scopes))
+    elif os.path.exists(legacy_token_file):
+        with open(legacy_token_file, 'rb') as token:
+            creds = pickle.load(token)
+    
+    # If no valid credentials, authenticate
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                Config.GOOGLE_CREDENTIALS_FILE,
+                list(scopes)
+            )
+            creds = flow.run_local_server(port=0)
+        
+        # Save credentials for next run
+        Path(token_file).write_text(creds.to_json())
+    elif not os.path.exists(token_file):
+        # Migrate a still-valid legacy pickle token to JSON
+        Path(token_file).write_text(creds.to_json())
+    
+    # One persistent HTTP connection for the lifetime of the cached service, so
+    # consecutive sends reuse the TCP/TLS session instead of reconnecting
+    http = AuthorizedHttp(creds, http=httplib2.Http())
+    
+    # Use the discovery document bundled with the client library; no HTTP fetch
+    service = build('gmail', 'v1', http=http, static_discovery=True, cache_discovery=False)
+    logger.info("Successfully authenticated with Gmail API")
+    return service, creds
+
+
+@functools.lru_cache(maxsize=4)
+def _encoded_resume(path: str, mtime: float) -> tuple[str, str, str]:
+    """
+    Read and base64-encode a resume file once per (path, mtime).
+    
+    The modification time is part of the cache key so an updated resume
+    is picked up without restarting the process.
+    
+    Returns:
+        Tuple of (maintype, subtype, base64 payload)
+    """
+    content_type, _ = mimetypes.guess_type(Path(path).name)
+    if content_type:
+        maintype, subtype = content_type.split("/", 1)
+    else:
+        maintype, subtype = "application", "octet-stream"
+    
+    with open(path, "rb") as attachment:
+        payload = base64.encodebytes(attachment.read()).decode("ascii")
+    
+    return maintype, subtype, payload
+
 
 class GmailSender:
     """Gmail client for sending emails with rate limiting."""
@@ -32,133 +118,193 @@ class GmailSender:
     SCOPES = ['https://www.googleapis.com/auth/gmail.send']
     
     def __init__(self):
-        self.service = None
-        self._authenticate()
+        self._service = None
+        self._credentials: Optional[Credentials] = None
+        self._from_header = f"{Config.SENDER_NAME} <{Config.GMAIL_USER}>"
+        # ((resume_path, mtime), attachment part) reused across messages
+        self._cached_attachment: Optional[tuple[tuple[str, float], MIMEBase]] = None
+        # Sends may run on several threads: authenticate only once, and give each
+        # thread its own HTTP transport (httplib2 connections are not thread-safe)
+        self._auth_lock = threading.Lock()
+        self._local = threading.local()
+        # Every per-thread transport handed out, so close() can release the connections
+        self._transports: List[AuthorizedHttp] = []
+        # Last day whose pre-midnight-key stats rows were folded into the midnight row
+        self._stats_merged_for: Optional[date] = None
+    
+    @property
+    def service(self) -> Resource:
+        """Gmail API service, authenticated on first access."""
+        if self._service is None:
+            with self._auth_lock:
+                if self._service is None:
+                    self._authenticate()
+        return self._service
+    
+    def _thread_http(self) -> AuthorizedHttp:
+        """Authorized HTTP transport owned by the calling thread."""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            self.service  # authenticates on first use, setting self._credentials
+            http = AuthorizedHttp(self._credentials, http=httplib2.Http())
+            self._local.http = http
+            with self._auth_lock:
+                self._transports.append(http)
+        return http
+    
+    def close(self):
+        """
+        Close the persistent connections opened for sending.
+        
+        Call once no sends are in flight; a later send simply reconnects.
+        """
+        with self._auth_lock:
+            transports, self._transports = self._transports, []
+        for http in transports:
+            http.close()
+        self._local = threading.local()
     
     def _authenticate(self):
         """Authenticate with Gmail API."""
-        creds = None
-        token_file = "gmail_token.pickle"
-        
-        # Try to load existing token
-        if os.path.exists(token_file):
-            with open(token_file, 'rb') as token:
-                creds = pickle.load(token)
-        
-        # If no valid credentials, authenticate
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    Config.GOOGLE_CREDENTIALS_FILE,
-                    self.SCOPES
-                )
-                creds = flow.run_local_server(port=0)
-            
-            # Save credentials for next run
-            with open(token_file, 'wb') as token:
-                pickle.dump(creds, token)
+        service, credentials = _build_service(tuple(self.SCOPES))
+        # Credentials first: other threads treat a set _service as "authenticated"
+        self._credentials = credentials
+        self._service = service
+    
+    def _merge_legacy_stats(self, session: Session, today_start: datetime, now: datetime):
+        """
+        Fold today's rows keyed by send time into the row keyed at midnight UTC.
         
-        self.service = build('gmail', 'v1', credentials=creds)
-        logger.info("Successfully authenticated with Gmail API")
+        Older versions keyed each day's stats row by the time of its first send.
+        Without this, the upsert would start a second counter for the same day
+        and double that day's limit. The rows are deleted and their counts
+        returned in one statement, so concurrent callers can't count them twice.
+        """
+        legacy_counts = session.execute(
+            delete(DailyEmailStats)
+            .where(
+                DailyEmailStats.date > today_start,
+                DailyEmailStats.date < today_start + timedelta(days=1)
+            )
+            .returning(DailyEmailStats.emails_sent)
+        ).scalars().all()
+        carried = sum(count or 0 for count in legacy_counts)
+        if carried:
+            stmt = sqlite_insert(DailyEmailStats).values(
+                date=today_start,
+                emails_sent=carried,
+                last_email_sent_at=now
+            )
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=[DailyEmailStats.date],
+                set_={'emails_sent': DailyEmailStats.emails_sent + carried}
+            ))
     
-    def _check_rate_limit(self, max_retries: int = 3) -> bool:
+    def _reserve_send_slot(self, max_retries: int = 3) -> Tuple[bool, bool, datetime]:
         """
-        Check if we can send an email based on daily email limits.
-        Returns True if we can send, False if daily limit reached.
+        Atomically reserve one of today's email slots.
+        
+        Increments today's counter with a single
+        INSERT ... ON CONFLICT(date) DO UPDATE ... RETURNING statement. The
+        update only applies while the counter is below DAILY_EMAIL_LIMIT, so
+        checking and counting happen in one write with no read-then-write race.
+        "database is locked" errors are retried with backoff; any other database
+        error lets the email go out uncounted (logged) rather than failing the send.
+        
+        Returns:
+            Tuple of (may_send, reserved, day_start). may_send is False once the daily
+            limit is reached. reserved is False when the counter could not be updated
+            (sending is still allowed then), so there is no slot to release.
+            day_start keys the day the slot was counted against; pass it to
+            _release_send_slot so a send failing after midnight UTC releases the right day.
         """
-        from sqlalchemy.exc import OperationalError
+        now = datetime.now(timezone.utc)
+        today_start = datetime.combine(now.date(), datetime.min.time())
+        
+        stmt = sqlite_insert(DailyEmailStats).values(
+            date=today_start,
+            emails_sent=1,
+            last_email_sent_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyEmailStats.date],
+            set_={
+                'emails_sent': DailyEmailStats.emails_sent + 1,
+                'last_email_sent_at': now
+            },
+            where=DailyEmailStats.emails_sent < Config.DAILY_EMAIL_LIMIT
+        ).returning(DailyEmailStats.emails_sent)
         
         for attempt in range(max_retries):
             session = get_session()
             try:
-                today = datetime.now(timezone.utc).date()
-                today_start = datetime.combine(today, datetime.min.time())
-                
-                # Get today's stats
-                stats = session.query(DailyEmailStats).filter(
-                    DailyEmailStats.date >= today_start
-                ).first()
-                
-                if stats:
-                    if stats.emails_sent >= Config.DAILY_EMAIL_LIMIT:
-                        logger.warning(f"Daily email limit reached: {stats.emails_sent}/{Config.DAILY_EMAIL_LIMIT}")
-                        return False
-                else:
-                    # Create new stats record (don't commit yet, just prepare)
-                    stats = DailyEmailStats(date=datetime.now(timezone.utc), emails_sent=0)
-                    session.add(stats)
-                    session.flush()  # Flush to get ID but don't commit yet
-                
-                return True
-                
+                if self._stats_merged_for != now.date():
+                    self._merge_legacy_stats(session, today_start, now)
+                emails_sent = session.execute(stmt).scalar()
+                session.commit()
+                self._stats_merged_for = now.date()
+                break
             except OperationalError as e:
-                error_str = str(e).lower()
-                if "locked" in error_str and attempt < max_retries - 1:
+                session.rollback()
+                if "locked" in str(e).lower() and attempt < max_retries - 1:
                     wait_time = 0.05 * (2 ** attempt)
-                    logger.warning(f"Database locked while checking rate limit (attempt {attempt + 1}/{max_retries}). Retrying...")
+                    logger.warning(f"Database locked while reserving a send slot (attempt {attempt + 1}/{max_retries}). Retrying...")
                     time.sleep(wait_time)
-                else:
-                    logger.error(f"Error checking rate limit: {e}")
-                    return True  # Allow sending if check fails
+                    continue
+                logger.error(f"Error checking rate limit, sending without counting this email: {e}")
+                return True, False, today_start  # Allow sending if check fails; nothing was reserved
             except Exception as e:
-                logger.error(f"Error checking rate limit: {e}")
-                return True  # Allow sending if check fails
+                session.rollback()
+                logger.error(f"Error checking rate limit, sending without counting this email: {e}")
+                return True, False, today_start
             finally:
                 session.close()
         
-        # If all retries failed, allow sending to avoid blocking
-        return True
+        if emails_sent is None or emails_sent > Config.DAILY_EMAIL_LIMIT:
+            if emails_sent is not None:
+                self._release_send_slot(today_start)
+            logger.warning(f"Daily email limit reached: {Config.DAILY_EMAIL_LIMIT}/{Config.DAILY_EMAIL_LIMIT}")
+            return False, False, today_start
+        
+        return True, True, today_start
     
-    def _update_rate_limit_stats(self, max_retries: int = 5):
-        """Update daily email statistics after sending with retry logic."""
-        from sqlalchemy.exc import OperationalError
+    def _release_send_slot(self, day_start: datetime):
+        """
+        Give back a slot reserved by _reserve_send_slot (e.g. when the send failed).
         
-        for attempt in range(max_retries):
-            session = get_session()
-            try:
-                today = datetime.now(timezone.utc).date()
-                today_start = datetime.combine(today, datetime.min.time())
-                
-                stats = session.query(DailyEmailStats).filter(
-                    DailyEmailStats.date >= today_start
-                ).first()
-                
-                if not stats:
-                    stats = DailyEmailStats(date=datetime.now(timezone.utc), emails_sent=0)
-                    session.add(stats)
-                
-                stats.emails_sent += 1
-                stats.last_email_sent_at = datetime.now(timezone.utc)
-                session.commit()
-                return  # Success, exit the retry loop
-                
-            except OperationalError as e:
-                session.rollback()
-                # Check if it's a database locked error
-                error_str = str(e).lower()
-                if "locked" in error_str or "database is locked" in error_str:
-                    if attempt < max_retries - 1:
-                        # Exponential backoff: wait 0.1s, 0.2s, 0.4s, 0.8s, 1.6s
-                        wait_time = 0.1 * (2 ** attempt)
-                        logger.warning(
-                            f"Database locked while updating rate limit stats (attempt {attempt + 1}/{max_retries}). "
-                            f"Retrying in {wait_time:.2f}s..."
-                        )
-                        time.sleep(wait_time)
-                    else:
-                        logger.error(f"Error updating rate limit stats after {max_retries} attempts: {e}")
-                else:
-                    # Other operational error, log and exit
-                    logger.error(f"Database operational error updating rate limit stats: {e}")
-                    break
-            except Exception as e:
-                session.rollback()
-                logger.error(f"Unexpected error updating rate limit stats: {e}")
-                break
-            finally:
-                session.close()
+        Args:
+            day_start: The day_start _reserve_send_slot returned for the reservation
+        """
+        session = get_session()
+        try:
+            session.execute(
+                update(DailyEmailStats)
+                .where(DailyEmailStats.date == day_start, DailyEmailStats.emails_sent > 0)
+                .values(emails_sent=DailyEmailStats.emails_sent - 1)
+            )
+            session.commit()
+        except OperationalError as e:
+            session.rollback()
+            logger.error(f"Error releasing rate limit slot: {e}")
+        finally:
+            session.close()
+    
+    def _resume_part(self, resume_path: str) -> MIMEBase:
+        """
+        Get the MIME attachment part for the resume.
+        
+        The part only holds the already-encoded bytes, so one instance is
+        built per (path, mtime) and attached to every outgoing message.
+        """
+        key = (resume_path, os.path.getmtime(resume_path))
+        if self._cached_attachment is None or self._cached_attachment[0] != key:
+            maintype, subtype, payload = _encoded_resume(*key)
+            part = MIMEBase(maintype, subtype)
+            part.set_payload(payload)
+            part["Content-Transfer-Encoding"] = "base64"
+            part.add_header("Content-Disposition", "attachment", filename=Path(resume_path).name)
+            self._cached_attachment = (key, part)
+        return self._cached_attachment[1]
     
     def _create_message(
         self,
@@ -167,8 +313,8 @@ class GmailSender:
         body: str,
         resume_path: Optional[str] = None,
         resume_drive_link: Optional[str] = None
-    ) -> dict:
-        """Create email message with optional resume attachment."""
+    ) -> bytes:
+        """Create email message with optional resume attachment, as RFC 822 bytes."""
         body_with_link = body
         if resume_drive_link and resume_drive_link not in body_with_link:
             drive_link_html = (
@@ -178,40 +324,23 @@ class GmailSender:
                 f'</p>'
             )
             # Prefer injecting before closing tags to keep HTML valid-ish.
-            if "</div>" in body_with_link:
-                body_with_link = body_with_link.replace("</div>", f"{drive_link_html}</div>", 1)
-            elif "</body>" in body_with_link:
-                body_with_link = body_with_link.replace("</body>", f"{drive_link_html}</body>", 1)
-            else:
-                body_with_link = body_with_link + drive_link_html
+            body_with_link = _TAIL_RE.sub(lambda m: drive_link_html + m.group(0), body_with_link, count=1)
             logger.info("Added resume drive link to email")
 
         message = MIMEMultipart()
         message["to"] = to
-        message["from"] = f"{Config.SENDER_NAME} <{Config.GMAIL_USER}>"
+        message["from"] = self._from_header
         message["subject"] = subject
         message.attach(MIMEText(body_with_link, "html"))
 
         # Add resume attachment if available
         if resume_path and Path(resume_path).exists():
-            filename = Path(resume_path).name
-            content_type, _ = mimetypes.guess_type(filename)
-            if content_type:
-                maintype, subtype = content_type.split("/", 1)
-            else:
-                maintype, subtype = "application", "octet-stream"
-
-            with open(resume_path, "rb") as attachment:
-                part = MIMEBase(maintype, subtype)
-                part.set_payload(attachment.read())
-
-            encoders.encode_base64(part)
-            part.add_header("Content-Disposition", "attachment", filename=filename)
-            message.attach(part)
+            message.attach(self._resume_part(resume_path))
             logger.info(f"Attached resume file: {resume_path}")
         
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-        return {'raw': raw_message}
+        buffer = io.BytesIO()
+        BytesGenerator(buffer, mangle_from_=False, policy=message.policy).flatten(message)
+        return buffer.getvalue()
     
     def send_email(
         self,
@@ -234,8 +363,9 @@ class GmailSender:
         Returns:
             Gmail message ID if successful, None otherwise
         """
-        # Check daily email limits
-        if not self._check_rate_limit():
+        # Reserve a slot against the daily email limit
+        may_send, reserved, day_start = self._reserve_send_slot()
+        if not may_send:
             logger.warning("Cannot send email: daily rate limit reached")
             return None
         
@@ -254,24 +384,28 @@ class GmailSender:
                 resume_drive_link=resume_drive_link or Config.RESUME_DRIVE_LINK
             )
             
-            # Send message
+            # Upload the message as message/rfc822 media rather than a JSON body with a
+            # base64 'raw' field: skips the extra base64 pass, the json.dumps of the
+            # ~1.4x larger payload, and a third of the bytes on the wire
+            media = MediaIoBaseUpload(io.BytesIO(message), mimetype='message/rfc822', resumable=False)
             sent_message = self.service.users().messages().send(
                 userId='me',
-                body=message
-            ).execute()
+                media_body=media
+            ).execute(http=self._thread_http())
             
             message_id = sent_message.get('id')
             logger.info(f"Email sent successfully to {to}. Message ID: {message_id}")
             
-            # Update rate limit stats
-            self._update_rate_limit_stats()
-            
             return message_id
             
         except HttpError as error:
             logger.error(f"Error sending email: {error}")
+            if reserved:
+                self._release_send_slot(day_start)
             return None
         except Exception as e:
             logger.error(f"Unexpected error sending email: {e}")
+            if reserved:
+                self._release_send_slot(day_start)
             return None
 
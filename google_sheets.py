@@ -1,13 +1,19 @@
 """
 Google Sheets integration for reading and updating job application data.
 """
+import functools
 import logging
-from typing import List, Dict, Optional
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional, Tuple
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, Resource
 from googleapiclient.errors import HttpError
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
 import pickle
 import os
 from pathlib import Path
@@ -15,6 +21,105 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Canonical row fields and the sheet headers (stripped, lowercased) accepted for each,
+# in priority order. A row takes the first non-empty value among the matching columns.
+FIELD_ALIASES: Dict[str, List[str]] = {
+    'company': ['company name', 'company_name', 'company'],
+    'position': ['position'],
+    'recruiters': [
+        'recruiter names', 'recruiter_names', 'recruiter name', 'recruiter_name',
+        'recruiter email', 'recruiter_email'
+    ],
+    'location': ['location'],
+    'job_posting_url': ['job posting url', 'job_posting_url', 'job posting', 'job_posting'],
+    'status': ['status'],
+    'expected_salary': ['expected salary', 'expected_salary', 'salary'],
+    'custom_message': ['message', 'custom message', 'custom_message'],
+}
+
+# Upper bound on concurrent per-sheet reads when the batch read is unavailable
+_MAX_READ_WORKERS = 8
+
+
+@functools.lru_cache(maxsize=None)
+def _build_service(scopes: tuple) -> Resource:
+    """
+    Load credentials and build the Google Sheets service.
+    
+    Cached so every GoogleSheetsClient in this process shares one
+    authenticated service and the token is only loaded/refreshed once.
+    """
+    creds = None
+    token_file = "token.json"
+    legacy_token_file = "token.pickle"  # Written by older versions
+    
+    # Try to load existing token
+    if os.path.exists(token_file):
+        creds = Credentials.from_authorized_user_file(token_file, list(scopes))
+    elif os.path.exists(legacy_token_file):
+        with open(legacy_token_file, 'rb') as token:
+            creds = pickle.load(token)
+    
+    # If no valid credentials, authenticate
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            # Try service account first, then OAuth
+            if os.path.exists(Config.GOOGLE_CREDENTIALS_FILE):
+                try:
+                    # Check if it's a service account JSON
+                    creds = service_account.Credentials.from_service_account_file(
+                        Config.GOOGLE_CREDENTIALS_FILE,
+                        scopes=list(scopes)
+                    )
+                except Exception:
+                    # If not service account, use OAuth flow
+                    from google_auth_oauthlib.flow import InstalledAppFlow
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        Config.GOOGLE_CREDENTIALS_FILE,
+                        list(scopes)
+                    )
+                    creds = flow.run_local_server(port=0)
+        
+        # Save user credentials for next run; service account credentials are
+        # rebuilt from the credentials file and have no authorized-user JSON form
+        if isinstance(creds, Credentials):
+            Path(token_file).write_text(creds.to_json())
+    elif isinstance(creds, Credentials) and not os.path.exists(token_file):
+        # Migrate a still-valid legacy pickle token to JSON
+        Path(token_file).write_text(creds.to_json())
+    
+    # Use the discovery document bundled with the client library; no HTTP fetch
+    service = build('sheets', 'v4', credentials=creds, static_discovery=True, cache_discovery=False)
+    logger.info("Successfully authenticated with Google Sheets API")
+    return service
+
+
+def _quote_sheet_name(sheet_name: str) -> str:
+    """Quote a worksheet name for use in an A1 range (e.g. 'My Sheet'!A:Z)."""
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_sheet_filter(pattern: str) -> re.Pattern:
+    """Compile a sheet-name filter regex once and reuse it across calls."""
+    return re.compile(pattern)
+
+
+def _column_letter(index: int) -> str:
+    """
+    Convert a 0-based column index to its A1 column letters.
+    
+    0 -> 'A', 25 -> 'Z', 26 -> 'AA', 27 -> 'AB', ...
+    """
+    letters = ""
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
 
 class GoogleSheetsClient:
     """Client for interacting with Google Sheets."""
@@ -24,47 +129,22 @@ class GoogleSheetsClient:
     def __init__(self, spreadsheet_id: str, worksheet_name: str = None):
         self.spreadsheet_id = spreadsheet_id
         self.worksheet_name = worksheet_name or Config.WORKSHEET_NAME
-        self.service = None
-        self._authenticate()
+        self._service = None
+        # {worksheet_name: {lowercased header: column letter}}
+        self._header_cache: Dict[str, Dict[str, str]] = {}
+        # Per-thread HTTP transports for parallel reads (httplib2 is not thread-safe)
+        self._local = threading.local()
+    
+    @property
+    def service(self) -> Resource:
+        """Google Sheets API service, authenticated on first access."""
+        if self._service is None:
+            self._authenticate()
+        return self._service
     
     def _authenticate(self):
         """Authenticate with Google Sheets API."""
-        creds = None
-        token_file = "token.pickle"
-        
-        # Try to load existing token
-        if os.path.exists(token_file):
-            with open(token_file, 'rb') as token:
-                creds = pickle.load(token)
-        
-        # If no valid credentials, authenticate
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                # Try service account first, then OAuth
-                if os.path.exists(Config.GOOGLE_CREDENTIALS_FILE):
-                    try:
-                        # Check if it's a service account JSON
-                        creds = service_account.Credentials.from_service_account_file(
-                            Config.GOOGLE_CREDENTIALS_FILE,
-                            scopes=self.SCOPES
-                        )
-                    except Exception:
-                        # If not service account, use OAuth flow
-                        from google_auth_oauthlib.flow import InstalledAppFlow
-                        flow = InstalledAppFlow.from_client_secrets_file(
-                            Config.GOOGLE_CREDENTIALS_FILE,
-                            self.SCOPES
-                        )
-                        creds = flow.run_local_server(port=0)
-                
-                # Save credentials for next run
-                with open(token_file, 'wb') as token:
-                    pickle.dump(creds, token)
-        
-        self.service = build('sheets', 'v4', credentials=creds)
-        logger.info("Successfully authenticated with Google Sheets API")
+        self._service = _build_service(tuple(self.SCOPES))
     
     def list_all_sheets(self) -> List[Dict]:
         """
@@ -93,41 +173,90 @@ class GoogleSheetsClient:
             logger.error(f"Error listing sheets: {error}")
             raise
     
+    @staticmethod
+    def _rows_from_values(values: List[List[str]], sheet_name: str) -> List[Dict]:
+        """
+        Convert raw cell values (first row = headers) to row dictionaries.
+        
+        Headers are resolved against FIELD_ALIASES once per worksheet, so every
+        row comes back keyed by canonical field name regardless of which header
+        variant the sheet uses. Missing fields are "".
+        
+        Args:
+            values: Cell values as returned by the Sheets API
+            sheet_name: Name of the worksheet the values came from
+        """
+        if not values:
+            logger.warning(f"No data found in worksheet: {sheet_name}")
+            return []
+        
+        # First row is headers
+        header_index = {}
+        for j, header in enumerate(values[0]):
+            header_index.setdefault(header.strip().lower(), j)
+        
+        # Column indexes backing each field, in alias priority order
+        field_columns = [
+            (field, [header_index[alias] for alias in aliases if alias in header_index])
+            for field, aliases in FIELD_ALIASES.items()
+        ]
+        
+        # Convert rows to dictionaries
+        rows = []
+        for i, row in enumerate(values[1:], start=2):  # Start at row 2 (1-indexed)
+            width = len(row)
+            row_dict = {}
+            for field, columns in field_columns:
+                value = ""
+                for j in columns:
+                    if j < width and row[j]:
+                        value = row[j]
+                        break
+                row_dict[field] = value
+            row_dict['_row_number'] = i  # Store row number for reference
+            row_dict['_sheet_name'] = sheet_name  # Store sheet name for reference
+            rows.append(row_dict)
+        
+        return rows
+    
+    def _thread_http(self) -> AuthorizedHttp:
+        """Authorized HTTP transport owned by the calling thread."""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.service._http.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+    
+    def _read_sheet_safely(self, sheet_name: str) -> List[Dict]:
+        """Read one worksheet on a worker thread; errors are logged and yield no rows."""
+        try:
+            result = self.service.spreadsheets().values().get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{_quote_sheet_name(sheet_name)}!A:Z"
+            ).execute(http=self._thread_http())
+            return self._parse_values(result.get('values', []), sheet_name)
+        except Exception as e:
+            logger.warning(f"Error reading sheet {sheet_name}: {e}")
+            return []
+    
     def read_all_rows(self, worksheet_name: str = None) -> List[Dict]:
         """
         Read all rows from the worksheet.
         Assumes first row contains headers.
-        Returns list of dictionaries with column names as keys.
+        Returns list of dictionaries keyed by the canonical fields in FIELD_ALIASES.
         
         Args:
             worksheet_name: Name of the worksheet to read. If None, uses self.worksheet_name
         """
         sheet_name = worksheet_name or self.worksheet_name
         try:
-            range_name = f"{sheet_name}!A:Z"  # Adjust range as needed
+            range_name = f"{_quote_sheet_name(sheet_name)}!A:Z"  # Adjust range as needed
             result = self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name
             ).execute()
             
-            values = result.get('values', [])
-            
-            if not values:
-                logger.warning(f"No data found in worksheet: {sheet_name}")
-                return []
-            
-            # First row is headers
-            headers = values[0]
-            
-            # Convert rows to dictionaries
-            rows = []
-            for i, row in enumerate(values[1:], start=2):  # Start at row 2 (1-indexed)
-                row_dict = {header: row[j] if j < len(row) else "" 
-                           for j, header in enumerate(headers)}
-                row_dict['_row_number'] = i  # Store row number for reference
-                row_dict['_sheet_name'] = sheet_name  # Store sheet name for reference
-                rows.append(row_dict)
-            
+            rows = self._parse_values(result.get('values', []), sheet_name)
             logger.info(f"Read {len(rows)} rows from worksheet: {sheet_name}")
             return rows
             
@@ -135,23 +264,28 @@ class GoogleSheetsClient:
             logger.error(f"Error reading from Google Sheets: {error}")
             raise
     
-    def read_all_sheets(self, sheet_filter: Optional[str] = None) -> List[Dict]:
+    def iter_all_sheets(self, sheet_filter: Optional[str] = None) -> Iterator[Dict]:
         """
-        Read all rows from all worksheets in the spreadsheet.
+        Iterate over the rows of all worksheets in the spreadsheet.
+        
+        Rows are converted and yielded one worksheet at a time, so callers can
+        start processing before every sheet has been converted (or, on the
+        per-sheet fallback path, fetched).
         
         Args:
             sheet_filter: Optional regex pattern to filter sheet names. 
                          If None, reads all sheets.
         
-        Returns:
-            List of dictionaries with column names as keys, including '_sheet_name'
+        Yields:
+            Dictionaries keyed by the canonical fields in FIELD_ALIASES,
+            including '_sheet_name'
         """
-        all_rows = []
+        total = 0
         sheets = self.list_all_sheets()
         
-        import re
-        pattern = re.compile(sheet_filter) if sheet_filter else None
+        pattern = _compile_sheet_filter(sheet_filter) if sheet_filter else None
         
+        sheet_names = []
         for sheet in sheets:
             sheet_name = sheet['title']
             
@@ -160,16 +294,56 @@ class GoogleSheetsClient:
                 logger.debug(f"Skipping sheet (doesn't match filter): {sheet_name}")
                 continue
             
-            try:
-                rows = self.read_all_rows(sheet_name)
-                all_rows.extend(rows)
-                logger.info(f"Read {len(rows)} rows from sheet: {sheet_name}")
-            except Exception as e:
-                logger.warning(f"Error reading sheet {sheet_name}: {e}")
-                continue
+            sheet_names.append(sheet_name)
         
-        logger.info(f"Total rows read from all sheets: {len(all_rows)}")
-        return all_rows
+        if not sheet_names:
+            logger.info("Total rows read from all sheets: 0")
+            return
+        
+        # Fetch every sheet in a single request instead of one request per sheet
+        try:
+            ranges = [f"{_quote_sheet_name(name)}!A:Z" for name in sheet_names]
+            result = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=ranges
+            ).execute()
+            value_ranges = result.get('valueRanges', [])
+        except HttpError as error:
+            # Fall back to per-sheet reads so one bad sheet doesn't block the rest;
+            # the reads are network-bound, so overlap them on a small thread pool
+            logger.warning(f"Batch read failed, reading sheets individually: {error}")
+            self.service  # authenticate once on this thread before fanning out
+            with ThreadPoolExecutor(max_workers=min(_MAX_READ_WORKERS, len(sheet_names))) as executor:
+                # map() yields in sheet order as soon as each read finishes
+                for sheet_name, rows in zip(sheet_names, executor.map(self._read_sheet_safely, sheet_names)):
+                    logger.info(f"Read {len(rows)} rows from sheet: {sheet_name}")
+                    total += len(rows)
+                    yield from rows
+            logger.info(f"Total rows read from all sheets: {total}")
+            return
+        
+        for i, sheet_name in enumerate(sheet_names):
+            values = value_ranges[i].get('values', []) if i < len(value_ranges) else []
+            rows = self._parse_values(values, sheet_name)
+            logger.info(f"Read {len(rows)} rows from sheet: {sheet_name}")
+            total += len(rows)
+            yield from rows
+        
+        logger.info(f"Total rows read from all sheets: {total}")
+    
+    def read_all_sheets(self, sheet_filter: Optional[str] = None) -> List[Dict]:
+        """
+        Read all rows from all worksheets in the spreadsheet.
+        
+        Args:
+            sheet_filter: Optional regex pattern to filter sheet names. 
+                         If None, reads all sheets.
+        
+        Returns:
+            List of dictionaries keyed by the canonical fields in FIELD_ALIASES,
+            including '_sheet_name'
+        """
+        return list(self.iter_all_sheets(sheet_filter))
     
     def update_cell(self, row: int, column: str, value: str, worksheet_name: str = None):
         """
@@ -183,7 +357,7 @@ class GoogleSheetsClient:
         """
         sheet_name = worksheet_name or self.worksheet_name
         try:
-            range_name = f"{sheet_name}!{column}{row}"
+            range_name = f"{_quote_sheet_name(sheet_name)}!{column}{row}"
             body = {
                 'values': [[value]]
             }
@@ -201,6 +375,46 @@ class GoogleSheetsClient:
             logger.error(f"Error updating Google Sheets: {error}")
             raise
     
+    def _cache_header_row(self, sheet_name: str, headers: List[str]) -> Dict[str, str]:
+        """
+        Build and cache the header-name to column-letter map for a worksheet.
+        
+        Keys are stripped, lowercased header names; the first matching
+        column wins when headers are duplicated.
+        """
+        column_map = {}
+        for i, header in enumerate(headers):
+            column_map.setdefault(header.strip().lower(), _column_letter(i))
+        
+        self._header_cache[sheet_name] = column_map
+        return column_map
+    
+    def _parse_values(self, values: List[List[str]], sheet_name: str) -> List[Dict]:
+        """Convert a worksheet's cell values to rows, remembering its header row."""
+        if values:
+            # Later status writes can resolve columns without refetching row 1
+            self._cache_header_row(sheet_name, values[0])
+        return self._rows_from_values(values, sheet_name)
+    
+    def _get_header_map(self, sheet_name: str) -> Dict[str, str]:
+        """
+        Get the header-name to column-letter map for a worksheet.
+        
+        Reuses the header row from an earlier read of the worksheet when there
+        was one; otherwise row 1 is fetched once and cached on the client.
+        """
+        if sheet_name in self._header_cache:
+            return self._header_cache[sheet_name]
+        
+        range_name = f"{_quote_sheet_name(sheet_name)}!1:1"
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id,
+            range=range_name
+        ).execute()
+        
+        headers = result.get('values', [])[0] if result.get('values') else []
+        return self._cache_header_row(sheet_name, headers)
+    
     def update_row(self, row: int, updates: Dict[str, str], worksheet_name: str = None):
         """
         Update multiple cells in a row.
@@ -212,28 +426,85 @@ class GoogleSheetsClient:
         """
         sheet_name = worksheet_name or self.worksheet_name
         try:
-            # First, get headers to map column names to letters
-            range_name = f"{sheet_name}!1:1"
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name
-            ).execute()
+            column_map = self._get_header_map(sheet_name)
             
-            headers = result.get('values', [])[0] if result.get('values') else []
-            column_map = {header.strip().lower(): (chr(65 + i), header) for i, header in enumerate(headers)}
-            
-            # Update each cell
+            # Collect all cells and write them in a single request
+            data = []
             for column_name, value in updates.items():
-                # Try exact match first, then case-insensitive
                 col_key = column_name.strip().lower()
                 if col_key in column_map:
-                    col_letter, _ = column_map[col_key]
-                    self.update_cell(row, col_letter, str(value), worksheet_name=sheet_name)
+                    col_letter = column_map[col_key]
+                    data.append({
+                        'range': f"{_quote_sheet_name(sheet_name)}!{col_letter}{row}",
+                        'values': [[str(value)]]
+                    })
+            
+            if not data:
+                return
+            
+            self.service.spreadsheets().values().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={
+                    'valueInputOption': 'RAW',
+                    'data': data
+                }
+            ).execute()
+            
+            logger.info(f"Updated {len(data)} cells in row {row} of {sheet_name}")
             
         except HttpError as error:
             logger.error(f"Error updating row in Google Sheets: {error}")
             raise
     
+    def batch_update_status(
+        self,
+        updates: Dict[str, List[Tuple[int, str]]],
+        column_name: str = 'Status'
+    ) -> int:
+        """
+        Write many status cells across worksheets in a single request.
+        
+        Args:
+            updates: Mapping of worksheet name to (row number, value) pairs
+            column_name: Header of the column to write to
+        
+        Returns:
+            Number of cells updated
+        """
+        col_key = column_name.strip().lower()
+        data = []
+        for sheet_name, cells in updates.items():
+            if not cells:
+                continue
+            # Column lookup happens once per worksheet, not once per row
+            col_letter = self._get_header_map(sheet_name).get(col_key)
+            if not col_letter:
+                logger.warning(f"Column '{column_name}' not found in {sheet_name}; skipping {len(cells)} updates")
+                continue
+            for row, value in cells:
+                data.append({
+                    'range': f"{_quote_sheet_name(sheet_name)}!{col_letter}{row}",
+                    'values': [[str(value)]]
+                })
+        
+        if not data:
+            return 0
+        
+        try:
+            self.service.spreadsheets().values().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={
+                    'valueInputOption': 'RAW',
+                    'data': data
+                }
+            ).execute()
+        except HttpError as error:
+            logger.error(f"Error batch updating Google Sheets: {error}")
+            raise
+        
+        logger.info(f"Updated {len(data)} {column_name} cells across {len(updates)} sheets")
+        return len(data)
+    
     def get_column_letter(self, column_name: str, worksheet_name: str = None) -> Optional[str]:
         """
         Get the column letter for a given column name.
@@ -247,20 +518,7 @@ class GoogleSheetsClient:
         """
         sheet_name = worksheet_name or self.worksheet_name
         try:
-            range_name = f"{sheet_name}!1:1"
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name
-            ).execute()
-            
-            headers = result.get('values', [])[0] if result.get('values') else []
-            col_key = column_name.strip().lower()
-            
-            for i, header in enumerate(headers):
-                if header.strip().lower() == col_key:
-                    return chr(65 + i)  # A=0, B=1, etc.
-            
-            return None
+            return self._get_header_map(sheet_name).get(column_name.strip().lower())
             
         except HttpError as error:
             logger.error(f"Error getting column letter: {error}")
@@ -1,34 +1,62 @@
 """
 Main application orchestrator for CV Mailer.
 """
+import atexit
 import logging
+import queue
 import sys
-from typing import List, Dict, Optional
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, List, Dict, Optional, Tuple
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from config import Config
-from google_sheets import GoogleSheetsClient
-from gmail_sender import GmailSender
 from email_templates import EmailTemplate
 from tracker import ApplicationTracker
 from models import JobStatus, EmailType, EmailStatus, init_database
 from recruiter_parser import RecruiterParser
 
-# Setup logging
+# Setup logging. Callers only enqueue records; a background listener thread does the
+# file and stdout writes, keeping disk I/O off the send path.
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [logging.FileHandler(Config.LOG_FILE), logging.StreamHandler(sys.stdout)]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.SimpleQueue()
+# QueueHandler.prepare() bakes the formatted text into the record, so it only passes
+# the message through; the listener's handlers apply the real format exactly once
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=getattr(logging, Config.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(Config.LOG_FILE),
-        logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[_log_queue_handler]
 )
+_log_listener = QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+# Flush whatever is still queued before the interpreter exits (including via sys.exit)
+atexit.register(_log_listener.stop)
 
 logger = logging.getLogger(__name__)
 console = Console()
 
+# Sheet Status values (casefolded) that mark a row as already processed
+_PROCESSED_STATUSES = frozenset({'sent', 'reached_out', 'applied'})
+
+# Status values accepted by CVMailer.update_status
+_JOB_STATUS_VALUES = frozenset(status.value for status in JobStatus)
+
+# Email records written per database commit while sending. Small enough that a crash
+# loses little send history (which would otherwise cause re-sends on the next run).
+_RECORD_COMMIT_BATCH = 10
+
+# Rows per progress-bar update, and the fewest rows worth showing a progress bar for
+_PROGRESS_STEP = 10
+_PROGRESS_MIN_ROWS = 20
+
 
 class CVMailer:
     """Main CV Mailer application."""
@@ -46,20 +74,118 @@ class CVMailer:
         # Initialize database
         init_database()
         
-        # Initialize clients
-        self.sheets_client = GoogleSheetsClient(Config.SPREADSHEET_ID, Config.WORKSHEET_NAME)
-        self.gmail_sender = GmailSender()
+        # Google clients are created on first use, so --stats never imports or
+        # authenticates the Google API stack
+        self._sheets_client = None
+        self._gmail_sender = None
+        # Send workers may reach gmail_sender concurrently; only one sender may be built
+        self._gmail_sender_lock = threading.Lock()
         self.tracker = ApplicationTracker()
         
-        # Show sheet information
+        # Sends are network-bound, so overlap them on a small pool of workers
+        self.executor = ThreadPoolExecutor(max_workers=Config.EMAIL_SEND_WORKERS)
+        
+        console.print("[green]✓[/green] CV Mailer initialized successfully")
+    
+    @property
+    def sheets_client(self):
+        """Google Sheets client, created on first access."""
+        if self._sheets_client is None:
+            from google_sheets import GoogleSheetsClient
+            self._sheets_client = GoogleSheetsClient(Config.SPREADSHEET_ID, Config.WORKSHEET_NAME)
+        return self._sheets_client
+    
+    @property
+    def gmail_sender(self):
+        """Gmail sender, created on first access."""
+        if self._gmail_sender is None:
+            with self._gmail_sender_lock:
+                if self._gmail_sender is None:
+                    from gmail_sender import GmailSender
+                    self._gmail_sender = GmailSender()
+        return self._gmail_sender
+    
+    def _show_sheet_info(self):
+        """Print the worksheets that will be scanned."""
         if Config.PROCESS_ALL_SHEETS:
             sheets = self.sheets_client.list_all_sheets()
             console.print(f"[cyan]Found {len(sheets)} sheets in spreadsheet[/cyan]")
             if len(sheets) <= 10:
                 sheet_names = [s['title'] for s in sheets]
                 console.print(f"[dim]Sheets: {', '.join(sheet_names)}[/dim]")
+    
+    def close(self):
+        """Cancel queued sends, wait for in-flight ones, then release worker threads, connections and the database session."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self._gmail_sender is not None:
+            self._gmail_sender.close()
+        self.tracker.close()
+    
+    def _send_one(self, to: str, subject: str, body: str) -> Optional[str]:
+        """Send a single email (runs on a worker thread)."""
+        return self.gmail_sender.send_email(to=to, subject=subject, body=body)
+    
+    @staticmethod
+    def _send_result(future: Future, send: Dict) -> Optional[str]:
+        """Message id of a finished send, or None when the worker raised."""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error sending email to {send['to']}: {e}", exc_info=True)
+            return None
+    
+    def _send_all(self, sends: List[Dict], on_result: Callable[[Dict, Optional[str]], None]):
+        """
+        Send queued emails concurrently.
         
-        console.print("[green]✓[/green] CV Mailer initialized successfully")
+        on_result records each result with commit=False; those records are
+        committed every _RECORD_COMMIT_BATCH results and once more at the end,
+        instead of one commit per email.
+        
+        A send whose worker raised is passed on as failed (message_id None).
+        If sending is interrupted (e.g. Ctrl-C), emails not started yet are
+        cancelled, and the ones already sent or in flight are still passed to
+        on_result and committed, so the next run doesn't email those recruiters again.
+        
+        Args:
+            sends: Queued emails, each with at least 'to', 'subject' and 'body' keys
+            on_result: Called with (send, message_id) in completion order, on the calling
+                thread, so database writes never touch the tracker session from a worker thread
+        """
+        if not sends:
+            return
+        
+        # Build the sender here on the calling thread rather than in the first workers
+        self.gmail_sender
+        
+        futures = {
+            self.executor.submit(self._send_one, send['to'], send['subject'], send['body']): send
+            for send in sends
+        }
+        unrecorded = set(futures)
+        try:
+            for i, future in enumerate(as_completed(futures), start=1):
+                send = futures[future]
+                on_result(send, self._send_result(future, send))
+                unrecorded.discard(future)
+                if i % _RECORD_COMMIT_BATCH == 0:
+                    self.tracker.commit()
+        except BaseException:
+            for future in unrecorded:
+                future.cancel()
+            for future in unrecorded:
+                if future.cancelled():
+                    continue
+                # Already sent, or in flight (result() waits for it). One failure must not
+                # keep the remaining sent emails from being recorded
+                send = futures[future]
+                try:
+                    on_result(send, self._send_result(future, send))
+                except Exception as e:
+                    logger.error(f"Could not record send to {send['to']}: {e}", exc_info=True)
+            raise
+        finally:
+            self.tracker.commit()
     
     def process_new_applications(self, dry_run: bool = False) -> int:
         """
@@ -77,6 +203,8 @@ class CVMailer:
         logger.info("============================")
         
         try:
+            self._show_sheet_info()
+            
             # Read data from Google Sheets
             if Config.PROCESS_ALL_SHEETS:
                 rows = self.sheets_client.read_all_sheets(sheet_filter=Config.SHEET_NAME_FILTER)
@@ -97,244 +225,219 @@ class CVMailer:
             
             sent_count = 0
             skipped_count = 0
+            # Rows that passed the field checks, rows waiting for their recruiters to be
+            # processed, emails queued for sending, and per-row send results
+            candidate_rows: List[Tuple] = []
+            queued_rows: List[Tuple] = []
+            pending_sends: List[Dict] = []
+            row_results: List[Dict] = []
             
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
-                console=console
+                console=console,
+                refresh_per_second=4,
+                disable=len(rows) < _PROGRESS_MIN_ROWS
             ) as progress:
                 task = progress.add_task("Processing applications...", total=len(rows))
                 
-                for row in rows:
-                    progress.update(task, advance=1)
+                for i, row in enumerate(rows):
+                    # Advance in steps rather than per row; the bar only redraws 4x/second anyway
+                    if i % _PROGRESS_STEP == 0:
+                        progress.update(task, completed=i)
                     
-                    # Extract data (adjust column names based on your sheet)
-                    # Support multiple column name variations
-                    company_name = (
-                        row.get('Company Name') or 
-                        row.get('company_name') or 
-                        row.get('Company') or 
-                        row.get('company') or 
-                        ''
-                    )
-                    position = (
-                        row.get('Position') or 
-                        row.get('position') or 
-                        ''
-                    )
+                    # Rows are keyed by canonical field; header variants are resolved
+                    # once per sheet (see FIELD_ALIASES in google_sheets.py)
+                    company_name = row['company']
+                    position = row['position']
+                    # Supports format: "Name - email@domain.com, Name2 - email2@domain.com"
+                    recruiter_cell = row['recruiters']
+                    location = row['location'] or None
+                    job_posting_url = row['job_posting_url'] or None
+                    status = row['status']
                     
-                    # Handle recruiter information - can be in "Recruiter Name", "Recruiter Names", or "Recruiter Email" column
-                    # Support format: "Name - email@domain.com, Name2 - email2@domain.com"
-                    recruiter_cell = (
-                        row.get('Recruiter Names') or 
-                        row.get('recruiter_names') or 
-                        row.get('Recruiter Name') or 
-                        row.get('recruiter_name') or 
-                        ''
-                    )
-                    if not recruiter_cell:
-                        # Fallback to Recruiter Email column if Recruiter Name is empty
-                        recruiter_cell = (
-                            row.get('Recruiter Email') or 
-                            row.get('recruiter_email') or 
-                            ''
-                        )
+                    # Optional fields: Expected salary and Message
+                    expected_salary = row['expected_salary'] or None
+                    custom_message = row['custom_message'] or None
                     
-                    location = (
-                        row.get('Location') or 
-                        row.get('location') or 
-                        None
-                    )
-                    job_posting_url = (
-                        row.get('Job Posting URL') or 
-                        row.get('job_posting_url') or 
-                        row.get('Job Posting') or 
-                        row.get('job_posting') or 
-                        None
-                    )
-                    status = (
-                        row.get('Status') or 
-                        row.get('status') or 
-                        ''
-                    )
+                    # Cheap field checks run first so rows that are skipped anyway
+                    # never reach the recruiter parser
+                    if not company_name or not position:
+                        logger.warning(f"Skipping row {row.get('_row_number')}: missing required fields (company: {company_name}, position: {position})")
+                        skipped_count += 1
+                        continue
                     
-                    # Read optional fields: Expected salary and Message
-                    expected_salary = (
-                        row.get('Expected salary') or 
-                        row.get('expected_salary') or 
-                        row.get('Expected Salary') or 
-                        row.get('Salary') or 
-                        row.get('salary') or 
-                        None
-                    )
-                    custom_message = (
-                        row.get('Message') or 
-                        row.get('message') or 
-                        row.get('Custom Message') or 
-                        row.get('custom_message') or 
-                        None
-                    )
+                    # Skip if already processed (status indicates sent)
+                    if status and status.strip().casefold() in _PROCESSED_STATUSES:
+                        # Most rows of a mature sheet land here; %-args skip the formatting when INFO is off
+                        logger.info("Skipping row %s: already processed", row.get('_row_number'))
+                        skipped_count += 1
+                        continue
                     
                     # Parse recruiters from the cell (handles multiple recruiters)
                     recruiters = RecruiterParser.parse_recruiters(recruiter_cell)
                     
-                    # Skip if required fields are missing
-                    if not company_name or not position or not recruiters:
-                        logger.warning(f"Skipping row {row.get('_row_number')}: missing required fields (company: {company_name}, position: {position}, recruiters: {len(recruiters)})")
+                    if not recruiters:
+                        logger.warning(f"Skipping row {row.get('_row_number')}: missing required fields (company: {company_name}, position: {position}, recruiters: 0)")
                         skipped_count += 1
                         continue
                     
-                    # Skip if already processed (status indicates sent)
-                    if status and status.lower() in ['sent', 'reached_out', 'applied']:
-                        logger.info(f"Skipping row {row.get('_row_number')}: already processed")
-                        skipped_count += 1
-                        continue
-                    
-                    # Get or create job application (one per row, shared across all recruiters)
+                    # One job application per row, shared across all recruiters
                     # Use sheet name + row number as unique identifier for multi-sheet support
                     sheet_name = row.get('_sheet_name', Config.WORKSHEET_NAME)
                     row_id = row.get('_row_number', 0)
-                    # Create unique ID: sheet_name + row_number (e.g., "2024-01-15_5")
+                    # Create unique ID: sheet_name + row_number (e.g., "2024-01-15_5").
+                    # This is only the stored lookup key; sheet writes use sheet_name and
+                    # row_id directly and never parse it back (sheet names may contain '_')
                     unique_row_id = f"{sheet_name}_{row_id}"
                     
-                    # Create job application with all recruiters
-                    job_app = self.tracker.get_or_create_job_application(
-                        spreadsheet_row_id=unique_row_id,
+                    # Applications are resolved after the scan, once every row's key is known
+                    candidate_rows.append((
+                        unique_row_id, sheet_name, row_id, recruiters, company_name, position,
+                        location, job_posting_url, expected_salary, custom_message
+                    ))
+                
+                progress.update(task, completed=len(rows))
+            
+            # One query loads the existing applications for every candidate row,
+            # instead of one lookup per row
+            self.tracker.preload_job_applications([candidate[0] for candidate in candidate_rows])
+            
+            for (unique_row_id, sheet_name, row_id, recruiters, company_name, position,
+                 location, job_posting_url, expected_salary, custom_message) in candidate_rows:
+                # Create job application with all recruiters
+                job_app = self.tracker.get_or_create_job_application(
+                    spreadsheet_row_id=unique_row_id,
+                    company_name=company_name,
+                    position=position,
+                    recruiters=recruiters,  # Pass all recruiters
+                    location=location,
+                    job_posting_url=job_posting_url,
+                    expected_salary=expected_salary,
+                    custom_message=custom_message,
+                    sheet_name=sheet_name,
+                    commit=False
+                )
+                
+                # Recruiters are processed below, once sent history is loaded for every row
+                row_result = {
+                    'sheet_name': sheet_name,
+                    'row_id': row_id,
+                    'recruiters': len(recruiters),
+                    'sent': 0,
+                    'skipped': 0
+                }
+                row_results.append(row_result)
+                queued_rows.append((job_app, recruiters, company_name, position, location, job_posting_url, row_result))
+            
+            # Commit all new and updated job applications together
+            self.tracker.commit()
+            
+            # One query for every (job, recipient) pair already contacted, instead of one per recruiter
+            sent_pairs = self.tracker.get_sent_recipients([job_app.id for job_app, *_ in queued_rows])
+            
+            # Process each recruiter separately; real sends are queued and sent together below
+            for job_app, recruiters, company_name, position, location, job_posting_url, row_result in queued_rows:
+                for recruiter in recruiters:
+                    recruiter_email = recruiter['email']
+                    recruiter_name = recruiter['name']
+                    
+                    if not recruiter_email:
+                        logger.warning(f"Skipping recruiter {recruiter_name}: no email address")
+                        row_result['skipped'] += 1
+                        continue
+                    
+                    # Check if we've already sent an email to this specific recruiter for this job
+                    if (job_app.id, recruiter_email) in sent_pairs:
+                        logger.info(f"Already sent email to {recruiter_email} for {company_name} - {position}")
+                        row_result['skipped'] += 1
+                        continue
+                    
+                    # Generate email (personalized for each recruiter)
+                    subject, body = EmailTemplate.render_first_contact(
+                        recruiter_name=recruiter_name,
                         company_name=company_name,
                         position=position,
-                        recruiters=recruiters,  # Pass all recruiters
                         location=location,
                         job_posting_url=job_posting_url,
-                        expected_salary=expected_salary,
-                        custom_message=custom_message,
-                        sheet_name=sheet_name
+                        custom_message=job_app.custom_message
                     )
                     
-                    # Process each recruiter separately
-                    emails_sent_for_row = 0
-                    emails_skipped_for_row = 0
-                    
-                    for recruiter in recruiters:
-                        recruiter_email = recruiter['email']
-                        recruiter_name = recruiter['name']
-                        
-                        if not recruiter_email:
-                            logger.warning(f"Skipping recruiter {recruiter_name}: no email address")
-                            emails_skipped_for_row += 1
-                            continue
-                        
-                        # Check if we've already sent an email to this specific recruiter for this job
-                        from models import EmailRecord
-                        existing_email = self.tracker.session.query(EmailRecord).filter_by(
-                            job_application_id=job_app.id,
-                            recipient_email=recruiter_email,
-                            status=EmailStatus.SENT
-                        ).first()
-                        
-                        if existing_email:
-                            logger.info(f"Already sent email to {recruiter_email} for {company_name} - {position}")
-                            emails_skipped_for_row += 1
-                            continue
-                        
-                        # Generate email (personalized for each recruiter)
-                        subject, body = EmailTemplate.render_first_contact(
-                            recruiter_name=recruiter_name,
-                            company_name=company_name,
-                            position=position,
-                            location=location,
-                            job_posting_url=job_posting_url,
-                            custom_message=job_app.custom_message
-                        )
-                        
-                        if dry_run:
-                            console.print(f"\n[dim]DRY RUN: Would send email to {recruiter_name or 'N/A'} ({recruiter_email})[/dim]")
-                            console.print(f"[dim]Subject: {subject}[/dim]")
-                            emails_sent_for_row += 1
-                            sent_count += 1
-                        else:
-                            # Send email
-                            message_id = self.gmail_sender.send_email(
-                                to=recruiter_email,
-                                subject=subject,
-                                body=body
-                            )
-                            
-                            if message_id:
-                                # Record email (one record per recruiter)
-                                self.tracker.record_email_sent(
-                                    job_application_id=job_app.id,
-                                    email_type=EmailType.FIRST_CONTACT,
-                                    subject=subject,
-                                    body=body,
-                                    recipient_email=recruiter_email,
-                                    recipient_name=recruiter_name,
-                                    gmail_message_id=message_id,
-                                    is_follow_up=False,
-                                    follow_up_number=0
-                                )
-                                
-                                emails_sent_for_row += 1
-                                sent_count += 1
-                                logger.info(f"✓ Sent to {recruiter_name or 'N/A'} ({recruiter_email}) - {position} - {company_name}")
-                                console.print(f"[green]✓[/green] Sent to {recruiter_name or 'N/A'} ({recruiter_email}) - {position} - {company_name}")
-                            else:
-                                # Record failure
-                                self.tracker.record_email_failed(
-                                    job_application_id=job_app.id,
-                                    email_type=EmailType.FIRST_CONTACT,
-                                    subject=subject,
-                                    body=body,
-                                    recipient_email=recruiter_email,
-                                    recipient_name=recruiter_name,
-                                    error_message="Failed to send email"
-                                )
-                                emails_skipped_for_row += 1
-                                logger.info(f"✗ Failed to send to {recruiter_email} - {position} - {company_name}")
-                                console.print(f"[red]✗[/red] Failed to send to {recruiter_email} - {position} - {company_name}")
-                    
-                    # Update spreadsheet status only once per row (after processing all recruiters)
-                    if emails_sent_for_row > 0 and not dry_run:
-                        try:
-                            # Extract sheet name and row number from unique_row_id
-                            if '_' in unique_row_id:
-                                sheet_name_for_update, row_num_str = unique_row_id.rsplit('_', 1)
-                                row_num = int(row_num_str)
-                                # Find Status column and update
-                                status_col = self.sheets_client.get_column_letter('Status', worksheet_name=sheet_name_for_update)
-                                if status_col:
-                                    self.sheets_client.update_cell(
-                                        row_num,
-                                        status_col,
-                                        'Reached Out',
-                                        worksheet_name=sheet_name_for_update
-                                    )
-                                else:
-                                    # Try updating by column name using update_row
-                                    self.sheets_client.update_row(
-                                        row_num,
-                                        {'Status': 'Reached Out'},
-                                        worksheet_name=sheet_name_for_update
-                                    )
-                            else:
-                                # Fallback for single sheet mode
-                                status_col = self.sheets_client.get_column_letter('Status')
-                                if status_col:
-                                    self.sheets_client.update_cell(
-                                        row_id,
-                                        status_col,
-                                        'Reached Out'
-                                    )
-                                else:
-                                    self.sheets_client.update_row(
-                                        row_id,
-                                        {'Status': 'Reached Out'}
-                                    )
-                        except Exception as e:
-                            logger.warning(f"Could not update spreadsheet: {e}")
+                    if dry_run:
+                        console.print(f"\n[dim]DRY RUN: Would send email to {recruiter_name or 'N/A'} ({recruiter_email})[/dim]")
+                        console.print(f"[dim]Subject: {subject}[/dim]")
+                        row_result['sent'] += 1
+                        sent_count += 1
+                    else:
+                        pending_sends.append({
+                            'to': recruiter_email,
+                            'name': recruiter_name,
+                            'subject': subject,
+                            'body': body,
+                            'job_application_id': job_app.id,
+                            'company_name': company_name,
+                            'position': position,
+                            'row': row_result
+                        })
+            
+            def record_result(send: Dict, message_id: Optional[str]):
+                """Record one send result on the main thread."""
+                nonlocal sent_count
+                row_result = send['row']
+                if message_id:
+                    # Record email (one record per recruiter)
+                    self.tracker.record_email_sent(
+                        job_application_id=send['job_application_id'],
+                        email_type=EmailType.FIRST_CONTACT,
+                        subject=send['subject'],
+                        body=send['body'],
+                        recipient_email=send['to'],
+                        recipient_name=send['name'],
+                        gmail_message_id=message_id,
+                        is_follow_up=False,
+                        follow_up_number=0,
+                        commit=False
+                    )
                     
-                    if emails_skipped_for_row == len(recruiters):
-                        # All recruiters were skipped (already sent or failed)
-                        skipped_count += 1
+                    row_result['sent'] += 1
+                    sent_count += 1
+                    logger.info(f"✓ Sent to {send['name'] or 'N/A'} ({send['to']}) - {send['position']} - {send['company_name']}")
+                    console.print(f"[green]✓[/green] Sent to {send['name'] or 'N/A'} ({send['to']}) - {send['position']} - {send['company_name']}")
+                else:
+                    # Record failure
+                    self.tracker.record_email_failed(
+                        job_application_id=send['job_application_id'],
+                        email_type=EmailType.FIRST_CONTACT,
+                        subject=send['subject'],
+                        body=send['body'],
+                        recipient_email=send['to'],
+                        recipient_name=send['name'],
+                        error_message="Failed to send email",
+                        commit=False
+                    )
+                    row_result['skipped'] += 1
+                    logger.info(f"✗ Failed to send to {send['to']} - {send['position']} - {send['company_name']}")
+                    console.print(f"[red]✗[/red] Failed to send to {send['to']} - {send['position']} - {send['company_name']}")
+            
+            # Send queued emails concurrently; results are recorded on the main thread
+            self._send_all(pending_sends, record_result)
+            
+            # Spreadsheet status updates, keyed by worksheet name
+            pending_status_updates: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+            for row_result in row_results:
+                # Update spreadsheet status only once per row (after processing all recruiters)
+                if row_result['sent'] > 0 and not dry_run:
+                    pending_status_updates[row_result['sheet_name']].append((row_result['row_id'], 'Reached Out'))
+                
+                if row_result['skipped'] == row_result['recruiters']:
+                    # All recruiters were skipped (already sent or failed)
+                    skipped_count += 1
+            
+            if pending_status_updates:
+                try:
+                    self.sheets_client.batch_update_status(pending_status_updates)
+                except Exception as e:
+                    logger.warning(f"Could not update spreadsheet: {e}")
             
             logger.info(f"Summary: {sent_count} sent, {skipped_count} skipped")
             console.print(f"\n[bold]Summary:[/bold] {sent_count} sent, {skipped_count} skipped\n")
@@ -371,17 +474,24 @@ class CVMailer:
             console.print(f"[cyan]Found {len(applications)} applications needing follow-up[/cyan]")
             
             sent_count = 0
+            # Follow-ups queued for sending
+            pending_sends: List[Dict] = []
             
             for app in applications:
-                follow_up_number = self.tracker.get_next_follow_up_number(app.id)
-                
-                # Get all recruiters who received the first email for this application
-                from models import EmailRecord
-                first_contact_emails = self.tracker.session.query(EmailRecord).filter_by(
-                    job_application_id=app.id,
-                    email_type=EmailType.FIRST_CONTACT,
-                    status=EmailStatus.SENT
-                ).all()
+                # Split the application's eager-loaded sent emails in one pass: first
+                # contacts, follow-ups already sent, and the last follow-up number
+                first_contact_emails = []
+                sent_follow_ups = set()  # (recipient_email, follow_up_number)
+                last_follow_up_number = 0
+                for email_record in app.emails:
+                    if email_record.status != EmailStatus.SENT:
+                        continue
+                    if email_record.email_type == EmailType.FIRST_CONTACT:
+                        first_contact_emails.append(email_record)
+                    if email_record.is_follow_up:
+                        sent_follow_ups.add((email_record.recipient_email, email_record.follow_up_number))
+                        last_follow_up_number = max(last_follow_up_number, email_record.follow_up_number or 0)
+                follow_up_number = last_follow_up_number + 1
                 
                 if not first_contact_emails:
                     # Fallback to recruiters from job application if no first contact emails found
@@ -409,15 +519,7 @@ class CVMailer:
                 # Send follow-up to each recruiter who received the first email
                 for recruiter in recruiters_to_follow_up:
                     # Check if we've already sent this follow-up number to this recruiter
-                    existing_follow_up = self.tracker.session.query(EmailRecord).filter_by(
-                        job_application_id=app.id,
-                        recipient_email=recruiter['email'],
-                        is_follow_up=True,
-                        follow_up_number=follow_up_number,
-                        status=EmailStatus.SENT
-                    ).first()
-                    
-                    if existing_follow_up:
+                    if (recruiter['email'], follow_up_number) in sent_follow_ups:
                         logger.info(f"Already sent follow-up #{follow_up_number} to {recruiter['email']}")
                         continue
                     
@@ -434,31 +536,42 @@ class CVMailer:
                         console.print(f"\n[dim]DRY RUN: Would send follow-up #{follow_up_number} to {recruiter['name'] or 'N/A'} ({recruiter['email']})[/dim]")
                         sent_count += 1
                     else:
-                        # Send email
-                        message_id = self.gmail_sender.send_email(
-                            to=recruiter['email'],
-                            subject=subject,
-                            body=body
-                        )
-                        
-                        if message_id:
-                            self.tracker.record_email_sent(
-                                job_application_id=app.id,
-                                email_type=EmailType.FOLLOW_UP,
-                                subject=subject,
-                                body=body,
-                                recipient_email=recruiter['email'],
-                                recipient_name=recruiter['name'],
-                                gmail_message_id=message_id,
-                                is_follow_up=True,
-                                follow_up_number=follow_up_number
-                            )
-                            sent_count += 1
-                            logger.info(f"✓ Follow-up #{follow_up_number} sent to {recruiter['name'] or 'N/A'} ({recruiter['email']}) - {app.company_name} - {app.position}")
-                            console.print(f"[green]✓[/green] Follow-up #{follow_up_number} sent to {recruiter['name'] or 'N/A'} ({recruiter['email']}) - {app.company_name} - {app.position}")
-                        else:
-                            logger.info(f"✗ Failed to send follow-up to {recruiter['email']} - {app.company_name} - {app.position}")
-                            console.print(f"[red]✗[/red] Failed to send follow-up to {recruiter['email']} - {app.company_name} - {app.position}")
+                        pending_sends.append({
+                            'to': recruiter['email'],
+                            'name': recruiter['name'],
+                            'subject': subject,
+                            'body': body,
+                            'app': app,
+                            'follow_up_number': follow_up_number
+                        })
+            
+            def record_result(send: Dict, message_id: Optional[str]):
+                """Record one follow-up result on the main thread."""
+                nonlocal sent_count
+                app = send['app']
+                follow_up_number = send['follow_up_number']
+                if message_id:
+                    self.tracker.record_email_sent(
+                        job_application_id=app.id,
+                        email_type=EmailType.FOLLOW_UP,
+                        subject=send['subject'],
+                        body=send['body'],
+                        recipient_email=send['to'],
+                        recipient_name=send['name'],
+                        gmail_message_id=message_id,
+                        is_follow_up=True,
+                        follow_up_number=follow_up_number,
+                        commit=False
+                    )
+                    sent_count += 1
+                    logger.info(f"✓ Follow-up #{follow_up_number} sent to {send['name'] or 'N/A'} ({send['to']}) - {app.company_name} - {app.position}")
+                    console.print(f"[green]✓[/green] Follow-up #{follow_up_number} sent to {send['name'] or 'N/A'} ({send['to']}) - {app.company_name} - {app.position}")
+                else:
+                    logger.info(f"✗ Failed to send follow-up to {send['to']} - {app.company_name} - {app.position}")
+                    console.print(f"[red]✗[/red] Failed to send follow-up to {send['to']} - {app.company_name} - {app.position}")
+            
+            # Send queued follow-ups concurrently; results are recorded on the main thread
+            self._send_all(pending_sends, record_result)
             
             logger.info(f"Summary: {sent_count} follow-ups sent")
             console.print(f"\n[bold]Summary:[/bold] {sent_count} follow-ups sent\n")
@@ -497,12 +610,14 @@ class CVMailer:
     
     def update_status(self, job_id: int, status: str, notes: Optional[str] = None):
         """Update job application status."""
+        status_value = status.lower()
+        if status_value not in _JOB_STATUS_VALUES:
+            console.print(f"[red]Invalid status: {status}[/red]")
+            return
+        
         try:
-            job_status = JobStatus(status.lower())
-            self.tracker.update_job_status(job_id, job_status, notes)
+            self.tracker.update_job_status(job_id, JobStatus(status_value), notes)
             console.print(f"[green]✓[/green] Updated job {job_id} status to {status}")
-        except ValueError:
-            console.print(f"[red]Invalid status: {status}[/red]")
         except Exception as e:
             console.print(f"[red]Error: {e}[/red]")
 
@@ -546,6 +661,7 @@ def main():
         border_style="cyan"
     ))
     
+    mailer = None
     try:
         mailer = CVMailer()
         
@@ -582,6 +698,9 @@ def main():
         logger.error(f"Fatal error: {e}", exc_info=True)
         console.print(f"[red]Fatal error: {e}[/red]")
         sys.exit(1)
+    finally:
+        if mailer is not None:
+            mailer.close()
 
 
 if __name__ == "__main__":
@@ -5,7 +5,7 @@ from datetime import datetime
 from enum import Enum
 from sqlalchemy import (
     create_engine, Column, Integer, String, DateTime, 
-    Boolean, Text, ForeignKey, Enum as SQLEnum, Table, text
+    Boolean, Text, ForeignKey, Enum as SQLEnum, Table, Index, event
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
@@ -48,9 +48,23 @@ class EmailStatus(str, Enum):
     BOUNCED = "bounced"
 
 
+class ResponseType(str, Enum):
+    """Type of response received from a recruiter."""
+    POSITIVE = "positive"
+    NEGATIVE = "negative"
+    NEUTRAL = "neutral"
+    INTERVIEW_REQUEST = "interview_request"
+
+
 class JobApplication(Base):
     """Job application record."""
     __tablename__ = "job_applications"
+    __table_args__ = (
+        # Status filters ordered by recency (follow-up candidates, listings by status)
+        Index("ix_ja_status_created", "status", "created_at"),
+        # Sheet-row lookups on every run (not unique: older databases may hold duplicates)
+        Index("ix_ja_spreadsheet_row_id", "spreadsheet_row_id"),
+    )
     
     id = Column(Integer, primary_key=True)
     spreadsheet_row_id = Column(String(255), nullable=False)  # Row identifier (can be "sheet_name_row" for multi-sheet)
@@ -85,6 +99,19 @@ class JobApplication(Base):
 class EmailRecord(Base):
     """Email communication record."""
     __tablename__ = "email_records"
+    __table_args__ = (
+        # Emails of an application, newest first; also serves eager loads by application
+        Index("ix_er_job_created", "job_application_id", "created_at"),
+        # Sent-recipient dedup (application IN (...) AND status = SENT), answered from the index alone
+        Index("ix_er_job_status_recipient", "job_application_id", "status", "recipient_email"),
+        # Follow-up eligibility (last send, highest follow-up per application), answered from the index alone
+        Index(
+            "ix_er_job_status_sent",
+            "job_application_id", "status", "sent_at", "is_follow_up", "follow_up_number"
+        ),
+        # Counts and scans by delivery status
+        Index("ix_er_status_created", "status", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True)
     job_application_id = Column(Integer, ForeignKey("job_applications.id"), nullable=False)
@@ -144,7 +171,7 @@ class ResponseRecord(Base):
     email_record_id = Column(Integer, ForeignKey("email_records.id"))
     
     # Response details
-    response_type = Column(String(50))  # positive, negative, neutral, interview_request
+    response_type = Column(String(50))  # ResponseType value (stored as its plain string)
     response_text = Column(Text)
     responded_at = Column(DateTime)
     
@@ -169,13 +196,46 @@ class DailyEmailStats(Base):
 _engine = None
 _Session = None
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply SQLite tuning PRAGMAs to every new DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    # WAL (Write-Ahead Logging) allows multiple readers and a single writer simultaneously
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # NORMAL is durable under WAL and avoids an fsync on every commit
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    # 64 MB page cache (negative = KiB) and memory-mapped reads of up to 256 MB
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    # SQLite leaves foreign key enforcement off per connection unless asked
+    cursor.execute("PRAGMA foreign_keys=ON")
+    # Lock waits are handled by the driver's busy timeout (connect_args "timeout"),
+    # so writers wait in SQLite instead of failing with "database is locked"
+    cursor.close()
+
+
+def _create_missing_indexes(engine):
+    """
+    Create declared indexes that don't exist yet.
+    
+    create_all() skips tables that already exist, so indexes added to the models
+    after a database was created would otherwise never be built.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
 def get_engine():
     """Create or get database engine with proper SQLite configuration."""
     global _engine
     if _engine is None:
         # Configure SQLite for better concurrency:
         # - connect_args with timeout allows waiting for locks (default 5s)
-        # - pool_pre_ping checks connections before using them
+        # - no pool_pre_ping: a local file connection never goes stale, and send
+        #   workers check out a connection per send, so a SELECT 1 each time is waste
+        # - the default QueuePool is kept (not StaticPool) because send workers
+        #   use the database concurrently and must not share one connection
         _engine = create_engine(
             f"sqlite:///{Config.DATABASE_PATH}",
             echo=False,
@@ -183,15 +243,10 @@ def get_engine():
                 "timeout": 30,  # Wait up to 30 seconds for locks
                 "check_same_thread": False  # Allow multi-threaded access
             },
-            pool_pre_ping=True,  # Verify connections before using
         )
+        event.listen(_engine, "connect", _set_sqlite_pragmas)
         Base.metadata.create_all(_engine)
-        
-        # Enable WAL (Write-Ahead Logging) mode for better concurrency
-        # This allows multiple readers and a single writer simultaneously
-        with _engine.connect() as conn:
-            conn.execute(text("PRAGMA journal_mode=WAL"))
-            conn.commit()
+        _create_missing_indexes(_engine)
     
     return _engine
 
@@ -201,12 +256,13 @@ def get_session():
     global _Session
     engine = get_engine()
     if _Session is None:
-        _Session = sessionmaker(bind=engine)
+        # Objects stay loaded after commit: the tracker commits in batches and keeps
+        # using the same applications, which would otherwise be re-SELECTed one by one
+        _Session = sessionmaker(bind=engine, expire_on_commit=False)
     return _Session()
 
 
 def init_database():
-    """Initialize database tables."""
-    engine = get_engine()
-    Base.metadata.create_all(engine)
+    """Initialize database tables (created, with any missing indexes, when the engine is first built)."""
+    get_engine()
 
@@ -8,6 +8,16 @@ from typing import List, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Email pattern for matching
+_EMAIL_PATTERN = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+_EMAIL_RE = re.compile(_EMAIL_PATTERN)
+# "Name - email" anywhere in a cell; the name part can contain any characters except commas
+_NAME_EMAIL_RE = re.compile(r'([^,]+?)\s*-\s*(' + _EMAIL_PATTERN + r')')
+# A whole comma-separated part of the form "Name - email", allowing en/em dashes
+_PART_NAME_EMAIL_RE = re.compile(r'^(.+?)\s*[-–—]\s*(' + _EMAIL_PATTERN + r')$')
+# A complete, valid email address
+_VALID_EMAIL_RE = re.compile(r'^' + _EMAIL_PATTERN + r'$')
+
 
 class RecruiterParser:
     """Parse recruiter information from various formats."""
@@ -35,25 +45,17 @@ class RecruiterParser:
         # Normalize the input: remove extra whitespace, handle newlines
         cell_value = ' '.join(cell_value.split())
         
-        recruiters = []
-        
-        # Email pattern for matching
-        email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+        # Name-only or note cells ("N/A", "TBD") can't contain a recruiter; skip both regex passes
+        if '@' not in cell_value:
+            logger.warning(f"Could not parse recruiter info (no email found): {cell_value}")
+            return []
         
-        # First, try to find all "Name - email" patterns using regex
+        # First, try to find all "Name - email" patterns in a single scan
         # This is more robust than splitting by comma first
-        # Pattern: (name part) - (email)
-        # The name part can contain any characters except the dash-email pattern
-        pattern = r'([^,]+?)\s*-\s*(' + email_pattern + r')'
-        matches = re.finditer(pattern, cell_value)
-        
-        for match in matches:
-            name = match.group(1).strip()
-            email = match.group(2).strip()
-            recruiters.append({
-                'name': name if name else None,
-                'email': email
-            })
+        recruiters = [
+            {'name': match.group(1).strip() or None, 'email': match.group(2)}
+            for match in _NAME_EMAIL_RE.finditer(cell_value)
+        ]
         
         # If we found patterns, use them. Otherwise, try a different approach
         if not recruiters:
@@ -66,7 +68,7 @@ class RecruiterParser:
                 
                 # Try to match "Name - email@domain.com" pattern
                 # Use a more permissive pattern that handles various dash styles
-                match = re.match(r'^(.+?)\s*[-–—]\s*(' + email_pattern + r')$', part.strip())
+                match = _PART_NAME_EMAIL_RE.match(part.strip())
                 
                 if match:
                     # Format: "Name - email@domain.com"
@@ -78,7 +80,7 @@ class RecruiterParser:
                     })
                 else:
                     # Check if it's just an email
-                    email_match = re.search(email_pattern, part)
+                    email_match = _EMAIL_RE.search(part)
                     if email_match:
                         email = email_match.group(0)
                         # Try to extract name from before the email
@@ -96,20 +98,14 @@ class RecruiterParser:
                         logger.warning(f"Could not parse recruiter info (no email found): {part}")
                         continue
         
-        # Remove duplicates (same email) - case insensitive
-        seen_emails = set()
-        unique_recruiters = []
+        # Remove duplicates (same email) - case insensitive, first occurrence wins
+        unique = {}
         for recruiter in recruiters:
-            if recruiter.get('email'):
-                email_lower = recruiter['email'].lower()
-                if email_lower not in seen_emails:
-                    seen_emails.add(email_lower)
-                    unique_recruiters.append(recruiter)
-            else:
-                # Keep recruiters without emails for now (might want to log this)
-                logger.warning(f"Recruiter entry has no email: {recruiter}")
+            unique.setdefault(recruiter['email'].lower(), recruiter)
+        unique_recruiters = list(unique.values())
         
-        logger.info(f"Parsed {len(unique_recruiters)} unique recruiters from: {cell_value[:50]}...")
+        # Runs for every sheet row; %-args defer formatting to when INFO is actually emitted
+        logger.info("Parsed %d unique recruiters from: %s...", len(unique_recruiters), cell_value[:50])
         return unique_recruiters
     
     @staticmethod
@@ -129,8 +125,7 @@ class RecruiterParser:
     @staticmethod
     def validate_email(email: str) -> bool:
         """Validate email format."""
-        if not email:
+        if not email or '@' not in email:
             return False
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return bool(_VALID_EMAIL_RE.match(email))
 
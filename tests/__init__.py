@@ -0,0 +1,37 @@
+"""
+Test package for CV Mailer.
+
+Config is read from the environment at import time, so the test settings are
+applied here, before any test module imports the application.
+
+Run from the repository root with:
+    python -m unittest discover -s tests -t .
+"""
+import os
+import tempfile
+
+_TEST_DIR = tempfile.mkdtemp(prefix="cv_mailer_tests_")
+_CREDENTIALS_FILE = os.path.join(_TEST_DIR, "credentials.json")
+with open(_CREDENTIALS_FILE, "w") as credentials:
+    credentials.write("{}")
+
+os.environ.update({
+    "DATABASE_PATH": os.path.join(_TEST_DIR, "cv_mailer.db"),
+    "LOG_FILE": os.path.join(_TEST_DIR, "cv_mailer.log"),
+    "TEMPLATE_CACHE_DIR": os.path.join(_TEST_DIR, "jinja_cache"),
+    "GOOGLE_CREDENTIALS_FILE": _CREDENTIALS_FILE,
+    "SPREADSHEET_ID": "test-spreadsheet",
+    "GMAIL_USER": "sender@example.com",
+    "RESUME_DRIVE_LINK": "https://example.com/resume",
+    "EMAIL_DELAY_MIN": "0",
+    "EMAIL_DELAY_MAX": "0",
+    "DAILY_EMAIL_LIMIT": "3",
+})
+
+
+def reset_database():
+    """Drop and recreate every table in the test database."""
+    from models import Base, get_engine
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
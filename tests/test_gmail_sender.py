@@ -0,0 +1,117 @@
+"""Tests for GmailSender's daily rate limiting."""
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from google.oauth2.credentials import Credentials
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from tests import reset_database
+from config import Config
+from gmail_sender import GmailSender
+from models import DailyEmailStats, get_session
+
+
+class ReserveSendSlotTest(unittest.TestCase):
+    """_reserve_send_slot counts sends per UTC day and only releases slots it took."""
+    
+    def setUp(self):
+        reset_database()
+        self.sender = GmailSender()
+        now = datetime.now(timezone.utc)
+        self.today_start = datetime.combine(now.date(), datetime.min.time())
+    
+    def _add_stats(self, day_key, emails_sent):
+        session = get_session()
+        session.add(DailyEmailStats(date=day_key, emails_sent=emails_sent))
+        session.commit()
+        session.close()
+    
+    def _stats(self):
+        session = get_session()
+        try:
+            return [(row.date, row.emails_sent) for row in session.query(DailyEmailStats)]
+        finally:
+            session.close()
+    
+    def test_row_keyed_by_send_time_counts_toward_today(self):
+        # Written by an older version: keyed by the time of the day's first send
+        self._add_stats(self.today_start + timedelta(seconds=1), Config.DAILY_EMAIL_LIMIT - 1)
+        
+        self.assertEqual(self.sender._reserve_send_slot(), (True, True, self.today_start))
+        self.assertEqual(self.sender._reserve_send_slot(), (False, False, self.today_start))
+        self.assertEqual(self._stats(), [(self.today_start, Config.DAILY_EMAIL_LIMIT)])
+    
+    def test_failed_send_without_reservation_releases_nothing(self):
+        self._add_stats(self.today_start, 2)
+        locked = OperationalError("INSERT", {}, Exception("database is locked"))
+        
+        with mock.patch.object(GmailSender, '_merge_legacy_stats', side_effect=locked), \
+                mock.patch.object(GmailSender, '_create_message', side_effect=RuntimeError("boom")):
+            self.assertIsNone(self.sender.send_email("ann@example.com", "Subject", "Body"))
+        
+        self.assertEqual(self._stats(), [(self.today_start, 2)])
+    
+    def test_locked_database_is_retried(self):
+        locked = OperationalError("INSERT", {}, Exception("database is locked"))
+        
+        # Locked on the first attempt; no pre-upgrade rows to merge on the second
+        with mock.patch.object(GmailSender, '_merge_legacy_stats', side_effect=[locked, None]) as merge:
+            self.assertEqual(self.sender._reserve_send_slot(), (True, True, self.today_start))
+        
+        self.assertEqual(merge.call_count, 2)
+        self.assertEqual(self._stats(), [(self.today_start, 1)])
+    
+    def test_other_database_errors_do_not_escape(self):
+        broken = IntegrityError("INSERT", {}, Exception("constraint failed"))
+        
+        with mock.patch.object(GmailSender, '_merge_legacy_stats', side_effect=broken):
+            self.assertEqual(self.sender._reserve_send_slot(), (True, False, self.today_start))
+    
+    def test_failure_after_midnight_releases_the_reserved_day(self):
+        tomorrow = self.today_start + timedelta(days=1)
+        self._add_stats(self.today_start, 1)
+        self._add_stats(tomorrow, 1)
+        
+        def fail_after_midnight(**kwargs):
+            _ShiftedDatetime.shift = timedelta(days=1)
+            raise RuntimeError("boom")
+        
+        _ShiftedDatetime.shift = timedelta(0)
+        with mock.patch('gmail_sender.datetime', _ShiftedDatetime), \
+                mock.patch.object(GmailSender, '_create_message', side_effect=fail_after_midnight):
+            self.assertIsNone(self.sender.send_email("ann@example.com", "Subject", "Body"))
+        
+        # The slot taken today was given back to today; tomorrow's count is untouched
+        self.assertEqual(sorted(self._stats()), [(self.today_start, 1), (tomorrow, 1)])
+
+
+class ThreadTransportTest(unittest.TestCase):
+    """Per-thread transports are authorized with the credentials the service was built from."""
+    
+    def test_transport_uses_the_built_credentials(self):
+        credentials = Credentials(token="token")
+        # A bare object: reaching into the service's private HTTP would raise
+        service = object()
+        
+        with mock.patch('gmail_sender._build_service', return_value=(service, credentials)):
+            sender = GmailSender()
+            http = sender._thread_http()
+        
+        self.assertIs(sender.service, service)
+        self.assertIs(http.credentials, credentials)
+        sender.close()
+
+
+class _ShiftedDatetime(datetime):
+    """datetime whose now() runs `shift` ahead of the real clock."""
+    
+    shift = timedelta(0)
+    
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) + cls.shift
+
+
+if __name__ == "__main__":
+    unittest.main()
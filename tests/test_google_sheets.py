@@ -0,0 +1,26 @@
+"""Tests for GoogleSheetsClient range building."""
+import unittest
+from unittest import mock
+
+import tests  # noqa: F401  (test configuration)
+from google_sheets import GoogleSheetsClient
+
+
+class UpdateRowRangeTest(unittest.TestCase):
+    """Worksheet names are quoted in every A1 range the client builds."""
+    
+    def test_header_fetch_and_cell_writes_quote_the_sheet_name(self):
+        client = GoogleSheetsClient("spreadsheet-id", "Bob's Jobs 2024")
+        client._service = mock.MagicMock()
+        values = client._service.spreadsheets.return_value.values.return_value
+        values.get.return_value.execute.return_value = {'values': [["Company", "Status"]]}
+        
+        client.update_row(3, {'status': "Reached Out"})
+        
+        self.assertEqual(values.get.call_args.kwargs['range'], "'Bob''s Jobs 2024'!1:1")
+        data = values.batchUpdate.call_args.kwargs['body']['data']
+        self.assertEqual(data, [{'range': "'Bob''s Jobs 2024'!B3", 'values': [["Reached Out"]]}])
+
+
+if __name__ == "__main__":
+    unittest.main()
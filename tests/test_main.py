@@ -0,0 +1,167 @@
+"""Tests for CVMailer's concurrent sending and logging setup."""
+import io
+import logging
+import re
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from tests import reset_database
+import main
+from main import CVMailer
+
+
+class _FakeSender:
+    """Stands in for GmailSender; records every send it is asked to make."""
+    
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+    
+    def send_email(self, to, subject, body, **kwargs):
+        if to.startswith("boom"):
+            raise RuntimeError("worker failure")
+        with self._lock:
+            self.sent.append(to)
+            return f"msg-{to}"
+    
+    def close(self):
+        pass
+
+
+class SendAllInterruptTest(unittest.TestCase):
+    """Interrupting _send_all must not leave sent emails unrecorded or keep sending."""
+    
+    def setUp(self):
+        reset_database()
+        self.mailer = CVMailer()
+        # One worker, so most sends are still queued when the interrupt arrives
+        self.mailer.executor.shutdown()
+        self.mailer.executor = ThreadPoolExecutor(max_workers=1)
+        self.mailer._gmail_sender = _FakeSender()
+    
+    def tearDown(self):
+        self.mailer.close()
+    
+    def test_interrupt_cancels_queued_sends_and_records_completed_ones(self):
+        sends = [{'to': f"r{i}@example.com", 'subject': "s", 'body': "b"} for i in range(20)]
+        recorded = []
+        interrupted = []
+        
+        def on_result(send, message_id):
+            if not interrupted:
+                interrupted.append(send['to'])
+                raise KeyboardInterrupt
+            recorded.append(send['to'])
+        
+        with self.assertRaises(KeyboardInterrupt):
+            self.mailer._send_all(sends, on_result)
+        self.mailer.close()
+        
+        sent = self.mailer._gmail_sender.sent
+        # Queued sends were cancelled instead of going out after the interrupt
+        self.assertLess(len(sent), len(sends))
+        # Every email that did go out was passed on for recording
+        self.assertCountEqual(recorded, sent)
+    
+    def test_worker_exception_is_recorded_as_failure(self):
+        sends = [{'to': to, 'subject': "s", 'body': "b"} for to in ("a@example.com", "boom@example.com", "c@example.com")]
+        results = {}
+        
+        self.mailer._send_all(sends, lambda send, message_id: results.__setitem__(send['to'], message_id))
+        
+        self.assertEqual(results, {
+            "a@example.com": "msg-a@example.com",
+            "boom@example.com": None,
+            "c@example.com": "msg-c@example.com",
+        })
+    
+    def test_interrupt_with_a_failed_worker_still_records_sent_emails(self):
+        self.mailer.executor.shutdown()
+        self.mailer.executor = ThreadPoolExecutor(max_workers=4)
+        addresses = ("a@example.com", "boom@example.com", "c@example.com", "d@example.com")
+        sends = [{'to': to, 'subject': "s", 'body': "b"} for to in addresses]
+        results = {}
+        interrupted = []
+        
+        def on_result(send, message_id):
+            if not interrupted:
+                interrupted.append(send['to'])
+                time.sleep(0.2)  # let the other sends finish, one of them by raising
+                raise KeyboardInterrupt
+            results[send['to']] = message_id
+        
+        with self.assertRaises(KeyboardInterrupt):
+            self.mailer._send_all(sends, on_result)
+        
+        self.assertEqual(set(results), set(addresses))
+        self.assertIsNone(results["boom@example.com"])
+        self.assertCountEqual(
+            [to for to, message_id in results.items() if message_id], self.mailer._gmail_sender.sent
+        )
+
+
+class _SlowInitSender(_FakeSender):
+    """A sender whose construction is slow enough for racing threads to overlap."""
+    
+    instances = 0
+    
+    def __init__(self):
+        type(self).instances += 1
+        time.sleep(0.05)
+        super().__init__()
+
+
+class GmailSenderCreationTest(unittest.TestCase):
+    """The lazily created sender must be built once, however many workers ask for it."""
+    
+    def setUp(self):
+        reset_database()
+        _SlowInitSender.instances = 0
+        self.mailer = CVMailer()
+    
+    def tearDown(self):
+        self.mailer.close()
+    
+    def test_concurrent_first_sends_create_one_sender(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+        
+        def send(i):
+            barrier.wait()
+            return self.mailer._send_one(f"r{i}@example.com", "s", "b")
+        
+        with mock.patch('gmail_sender.GmailSender', _SlowInitSender):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(send, range(workers)))
+        
+        self.assertEqual(_SlowInitSender.instances, 1)
+        self.assertEqual(len(self.mailer._gmail_sender.sent), workers)
+        self.assertTrue(all(results))
+
+
+class LogFormatTest(unittest.TestCase):
+    """Records pass through the log queue and are formatted once, by the listener's handlers."""
+    
+    def test_listener_writes_each_line_formatted_once(self):
+        stdout_handler = main._log_handlers[1]
+        stream = io.StringIO()
+        original_stream = stdout_handler.setStream(stream)
+        try:
+            logging.getLogger("log_format_test").info("hello %s", "world")
+            # Stopping the listener drains the queue; restart it for the other tests
+            main._log_listener.stop()
+            main._log_listener.start()
+        finally:
+            stdout_handler.setStream(original_stream)
+        
+        self.assertRegex(
+            stream.getvalue(),
+            re.compile(r"^\d{4}-\d{2}-\d{2} [\d:,]+ - log_format_test - INFO - hello world$", re.M)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Tests for ApplicationTracker."""
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from tests import reset_database
+from models import EmailRecord, EmailStatus, EmailType, get_engine
+from tracker import ApplicationTracker
+
+
+class RepairFollowUpNumbersTest(unittest.TestCase):
+    """repair_follow_up_numbers renumbers each application's follow-up waves to 1..N."""
+    
+    def setUp(self):
+        reset_database()
+        self.tracker = ApplicationTracker()
+        self.app = self.tracker.get_or_create_job_application(
+            "Sheet1_2", "Acme", "Engineer", [{'name': "Ann", 'email': "ann@example.com"}]
+        )
+        self.start = datetime(2024, 1, 1)
+    
+    def tearDown(self):
+        self.tracker.close()
+    
+    def _add_follow_up(self, follow_up_number, days):
+        """Add a sent follow-up for the test application, `days` after the start date."""
+        record = EmailRecord(
+            job_application=self.app,
+            email_type=EmailType.FOLLOW_UP,
+            subject="Following up",
+            body="body",
+            recipient_email="ann@example.com",
+            status=EmailStatus.SENT,
+            is_follow_up=True,
+            follow_up_number=follow_up_number,
+            sent_at=self.start + timedelta(days=days),
+        )
+        self.tracker.session.add(record)
+        self.tracker.session.flush()
+        if follow_up_number is None:
+            # The column default replaces None on insert, so write the NULL directly
+            self.tracker.session.query(EmailRecord).filter_by(id=record.id).update(
+                {EmailRecord.follow_up_number: None}, synchronize_session=False
+            )
+        self.tracker.session.commit()
+        return record
+    
+    def _follow_up_numbers(self):
+        return [
+            number for (number,) in self.tracker.session.query(EmailRecord.follow_up_number)
+            .filter_by(job_application_id=self.app.id)
+            .order_by(EmailRecord.sent_at)
+        ]
+    
+    def test_null_follow_up_number_is_ignored(self):
+        self._add_follow_up(None, 1)
+        self._add_follow_up(3, 2)
+        
+        stats = self.tracker.repair_follow_up_numbers(dry_run=False)
+        
+        self.assertEqual(stats, {"applications_scanned": 1, "applications_changed": 1, "rows_updated": 1})
+        self.assertEqual(self._follow_up_numbers(), [None, 1])
+    
+    def test_swapped_waves_stay_separate(self):
+        self._add_follow_up(3, 1)
+        self._add_follow_up(1, 2)
+        
+        stats = self.tracker.repair_follow_up_numbers(dry_run=False)
+        
+        self.assertEqual(stats["rows_updated"], 2)
+        self.assertEqual(self._follow_up_numbers(), [1, 2])
+    
+    def test_loaded_records_see_the_new_numbers(self):
+        first = self._add_follow_up(3, 1)
+        second = self._add_follow_up(5, 2)
+        
+        self.tracker.repair_follow_up_numbers(dry_run=False)
+        
+        self.assertEqual((first.follow_up_number, second.follow_up_number), (1, 2))
+        self.assertEqual(self.tracker.get_next_follow_up_number(self.app.id), 3)
+
+
+class FollowUpCandidatesQueryCountTest(unittest.TestCase):
+    """get_applications_needing_follow_up loads candidates in a fixed number of statements."""
+    
+    def setUp(self):
+        reset_database()
+        # Build the data with a separate tracker, so the one under test starts with an empty session
+        with ApplicationTracker() as setup:
+            for row in range(3):
+                app = setup.get_or_create_job_application(
+                    f"Sheet1_{row + 2}", f"Company {row}", "Engineer",
+                    [{'name': "Ann", 'email': f"ann{row}@example.com"},
+                     {'name': "Bob", 'email': f"bob{row}@example.com"}]
+                )
+                for recruiter in app.recruiters:
+                    record = setup.record_email_sent(
+                        job_application_id=app.id,
+                        email_type=EmailType.FIRST_CONTACT,
+                        subject="Hello",
+                        body="body",
+                        recipient_email=recruiter.email,
+                        gmail_message_id=f"msg-{recruiter.email}",
+                    )
+                    record.sent_at = datetime.utcnow() - timedelta(days=30)
+            setup.commit()
+        self.tracker = ApplicationTracker()
+        self.statements = []
+        event.listen(get_engine(), "before_cursor_execute", self._count)
+    
+    def tearDown(self):
+        event.remove(get_engine(), "before_cursor_execute", self._count)
+        self.tracker.close()
+    
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    def test_candidates_and_their_relationships_take_three_statements(self):
+        applications = self.tracker.get_applications_needing_follow_up()
+        # What send_follow_ups reads from each candidate
+        for app in applications:
+            [recruiter.email for recruiter in app.recruiters]
+            [email.job_application for email in app.emails]
+        
+        self.assertEqual(len(applications), 3)
+        # Candidate query plus one selectin load each for recruiters and emails
+        self.assertEqual(len(self.statements), 3, self.statements)
+    
+    def test_unplanned_lazy_load_raises(self):
+        applications = self.tracker.get_applications_needing_follow_up()
+        
+        with self.assertRaises(InvalidRequestError):
+            applications[0].recruiters[0].job_applications
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,30 +2,58 @@
 Tracking system for job applications and email communications.
 """
 import logging
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Tuple
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, raiseload, selectinload
 from models import (
     JobApplication, EmailRecord, ResponseRecord, JobStatus, 
-    EmailType, EmailStatus, Recruiter, get_session
+    EmailType, EmailStatus, Recruiter, ResponseType, get_session
 )
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Response types that move an application to INTERVIEW_SCHEDULED. ResponseType is a str
+# enum, so plain strings like 'positive' hash and compare equal to its members
+_INTERVIEW_RESPONSES = frozenset({ResponseType.POSITIVE, ResponseType.INTERVIEW_REQUEST})
+
 
 class ApplicationTracker:
     """Track job applications and email communications."""
     
     def __init__(self):
         self.session = get_session()
+        # Applications loaded by preload_job_applications, keyed by spreadsheet_row_id;
+        # a preloaded key with no entry is known not to exist yet
+        self._preloaded_row_ids: Set[str] = set()
+        self._apps_by_row_id: Dict[str, JobApplication] = {}
     
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.session.close()
+        self.close()
+    
+    def commit(self):
+        """
+        Commit the changes queued by calls made with commit=False.
+        
+        Batch drivers call this once per batch, so many tracker writes share one transaction.
+        """
+        self.session.commit()
+    
+    def close(self):
+        """Refresh SQLite planner statistics and close the session."""
+        try:
+            # Cheap incremental ANALYZE of only the tables whose stats look stale
+            self.session.execute(text("PRAGMA analysis_limit=400"))
+            self.session.execute(text("PRAGMA optimize"))
+        except OperationalError as e:
+            logger.warning(f"Could not optimize database: {e}")
+        finally:
+            self.session.close()
     
     def get_or_create_job_application(
         self,
@@ -37,18 +65,23 @@ class ApplicationTracker:
         job_posting_url: Optional[str] = None,
         expected_salary: Optional[str] = None,
         custom_message: Optional[str] = None,
-        sheet_name: Optional[str] = None
+        sheet_name: Optional[str] = None,
+        commit: bool = True
     ) -> JobApplication:
         """
         Get existing or create new job application.
         
         Args:
             recruiters: List of dictionaries with 'name' and 'email' keys
+            commit: If False, the caller commits (lets a batch share one transaction)
         """
         # Check if application already exists
-        app = self.session.query(JobApplication).filter_by(
-            spreadsheet_row_id=spreadsheet_row_id
-        ).first()
+        if spreadsheet_row_id in self._preloaded_row_ids:
+            app = self._apps_by_row_id.get(spreadsheet_row_id)
+        else:
+            app = self.session.query(JobApplication).filter_by(
+                spreadsheet_row_id=spreadsheet_row_id
+            ).first()
         
         if app:
             # Update if needed
@@ -77,43 +110,82 @@ class ApplicationTracker:
             status=JobStatus.DRAFT
         )
         self.session.add(app)
-        self.session.flush()  # Flush to get the ID
+        self._apps_by_row_id[spreadsheet_row_id] = app
         
         # Link all recruiters to the application
         self._link_recruiters_to_application(app, recruiters)
         
-        self.session.commit()
+        if commit:
+            self.session.commit()
         logger.info(f"Created new job application: {company_name} - {position} with {len(recruiters)} recruiters")
         return app
     
+    def preload_job_applications(self, spreadsheet_row_ids: List[str]):
+        """
+        Load the existing applications (and their recruiters) for a batch of rows in one query.
+        
+        get_or_create_job_application then resolves these row ids from memory instead of
+        querying per row, and new applications are inserted together at the next flush.
+        
+        Args:
+            spreadsheet_row_ids: Row identifiers about to be passed to get_or_create_job_application
+        """
+        if not spreadsheet_row_ids:
+            return
+        
+        applications = self.session.query(JobApplication).options(
+            selectinload(JobApplication.recruiters)
+        ).filter(
+            JobApplication.spreadsheet_row_id.in_(spreadsheet_row_ids)
+        ).order_by(JobApplication.id)
+        
+        for app in applications:
+            # Keep the first match, like the per-row lookup's .first()
+            self._apps_by_row_id.setdefault(app.spreadsheet_row_id, app)
+        self._preloaded_row_ids.update(spreadsheet_row_ids)
+    
     def _link_recruiters_to_application(self, app: JobApplication, recruiters: List[Dict[str, str]]):
         """Link recruiters to a job application, creating recruiter records if needed."""
         if not recruiters:
             return
         
+        # Re-runs over already-processed rows usually list the same recruiters; relinking
+        # would only clear and re-add the same rows, so skip the per-recruiter lookups
+        emails = {r.get('email') for r in recruiters if r.get('email')}
+        if {r.email for r in app.recruiters} == emails:
+            return
+        
         # Clear existing recruiters for this application
         app.recruiters.clear()
         
+        # One query for the recruiters that already exist, instead of one per email
+        recruiters_by_email = {
+            recruiter.email: recruiter
+            for recruiter in self.session.query(Recruiter).filter(Recruiter.email.in_(emails))
+        }
+        
+        # Emails linked so far; the list was just cleared, so this replaces an O(K) list scan per recruiter
+        linked_emails = set()
         for recruiter_data in recruiters:
             email = recruiter_data.get('email')
             name = recruiter_data.get('name')
             
-            if not email:
+            if not email or email in linked_emails:
                 continue
             
-            # Get or create recruiter
-            recruiter = self.session.query(Recruiter).filter_by(email=email).first()
+            # Get or create recruiter; new ones are inserted together at the next flush
+            recruiter = recruiters_by_email.get(email)
             if not recruiter:
                 recruiter = Recruiter(
                     email=email,
                     name=name
                 )
                 self.session.add(recruiter)
-                self.session.flush()
+                recruiters_by_email[email] = recruiter
             
             # Link recruiter to application
-            if recruiter not in app.recruiters:
-                app.recruiters.append(recruiter)
+            app.recruiters.append(recruiter)
+            linked_emails.add(email)
     
     def record_email_sent(
         self,
@@ -125,15 +197,23 @@ class ApplicationTracker:
         recipient_name: Optional[str] = None,
         gmail_message_id: Optional[str] = None,
         is_follow_up: bool = False,
-        follow_up_number: int = 0
+        follow_up_number: int = 0,
+        commit: bool = True
     ) -> EmailRecord:
-        """Record that an email was sent."""
-        job_app = self.session.query(JobApplication).get(job_application_id)
+        """
+        Record that an email was sent.
+        
+        Args:
+            commit: If False, the record is only added to the session and the caller commits
+        """
+        job_app = self.session.get(JobApplication, job_application_id)
         if not job_app:
             raise ValueError(f"Job application {job_application_id} not found")
         
+        # One timestamp for the send and the status change it triggers
+        now = datetime.now(timezone.utc)
         email_record = EmailRecord(
-            job_application_id=job_application_id,
+            job_application=job_app,  # keeps job_app.emails current without expiring it
             email_type=email_type,
             subject=subject,
             body=body,
@@ -143,7 +223,7 @@ class ApplicationTracker:
             gmail_message_id=gmail_message_id,
             is_follow_up=is_follow_up,
             follow_up_number=follow_up_number,
-            sent_at=datetime.now(timezone.utc) if gmail_message_id else None
+            sent_at=now if gmail_message_id else None
         )
         
         self.session.add(email_record)
@@ -151,9 +231,10 @@ class ApplicationTracker:
         # Update job application status
         if job_app.status == JobStatus.DRAFT:
             job_app.status = JobStatus.REACHED_OUT
-            job_app.applied_at = datetime.now(timezone.utc)
+            job_app.applied_at = now
         
-        self.session.commit()
+        if commit:
+            self.session.commit()
         log = f"Recorded email sent for job application {job_application_id}"
         logger.info(log)
         return email_record
@@ -166,15 +247,21 @@ class ApplicationTracker:
         body: str,
         recipient_email: str,
         recipient_name: Optional[str] = None,
-        error_message: str = "Failed to send email"
+        error_message: str = "Failed to send email",
+        commit: bool = True
     ):
-        """Record that an email failed to send."""
-        job_app = self.session.query(JobApplication).get(job_application_id)
+        """
+        Record that an email failed to send.
+        
+        Args:
+            commit: If False, the record is only added to the session and the caller commits
+        """
+        job_app = self.session.get(JobApplication, job_application_id)
         if not job_app:
             raise ValueError(f"Job application {job_application_id} not found")
         
         email_record = EmailRecord(
-            job_application_id=job_application_id,
+            job_application=job_app,  # keeps job_app.emails current without expiring it
             email_type=email_type,
             subject=subject,
             body=body,
@@ -185,54 +272,65 @@ class ApplicationTracker:
         )
         
         self.session.add(email_record)
-        self.session.commit()
+        if commit:
+            self.session.commit()
         logger.warning(f"Recorded email failure for job application {job_application_id}: {error_message}")
     
+    def get_sent_recipients(self, job_application_ids: List[int]) -> Set[Tuple[int, str]]:
+        """
+        Get the recipients already emailed successfully for a set of job applications.
+        
+        Returns:
+            Set of (job_application_id, recipient_email) pairs with a SENT email
+        """
+        if not job_application_ids:
+            return set()
+        
+        rows = self.session.query(
+            EmailRecord.job_application_id,
+            EmailRecord.recipient_email
+        ).filter(
+            EmailRecord.job_application_id.in_(set(job_application_ids)),
+            EmailRecord.status == EmailStatus.SENT
+        ).all()
+        
+        return {(job_id, email) for job_id, email in rows}
+    
     def get_applications_needing_follow_up(self) -> List[JobApplication]:
         """Get job applications that need follow-up emails."""
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=Config.FOLLOW_UP_DAYS)
         
-        applications = self.session.query(JobApplication).filter(
+        # One statement decides eligibility from each candidate's sent emails: the last send
+        # must be older than the cutoff and fewer than MAX_FOLLOW_UPS follow-ups sent.
+        # IMPORTANT: EmailRecord is one row per recipient, so we must NOT count rows
+        # (multi-recruiter applications would inflate counts and skip numbers).
+        # Instead, treat follow-ups as the max follow_up_number we've successfully sent.
+        # sent_at is stored as naive UTC, which compares directly with the UTC cutoff.
+        last_follow_up_number = func.coalesce(
+            func.max(case((EmailRecord.is_follow_up.is_(True), EmailRecord.follow_up_number))), 0
+        )
+        
+        # Recruiters and emails are loaded up front (one query each), and only for the
+        # applications that qualify; any other relationship that would need SQL raises
+        # instead of silently issuing a lazy load per application
+        return self.session.query(JobApplication).options(
+            selectinload(JobApplication.recruiters),
+            selectinload(JobApplication.emails),
+            raiseload('*', sql_only=True)
+        ).join(
+            JobApplication.emails
+        ).filter(
             JobApplication.status.in_([
                 JobStatus.REACHED_OUT,
                 JobStatus.APPLIED
-            ])
-        ).all()
-        
-        needing_follow_up = []
-        for app in applications:
-            # Get last email sent
-            last_email = self.session.query(EmailRecord).filter_by(
-                job_application_id=app.id,
-                status=EmailStatus.SENT
-            ).order_by(EmailRecord.sent_at.desc()).first()
-            
-            if not last_email:
-                continue
-            
-            # Check if enough time has passed
-            # Normalize sent_at to timezone-aware (UTC) if it's naive
-            if last_email.sent_at:
-                sent_at = last_email.sent_at
-                if sent_at.tzinfo is None:
-                    # Assume naive datetime is UTC
-                    sent_at = sent_at.replace(tzinfo=timezone.utc)
-                
-                if sent_at < cutoff_date:
-                    # Count existing follow-ups
-                    # IMPORTANT: EmailRecord is one row per recipient, so we must NOT count rows
-                    # (multi-recruiter applications would inflate counts and skip numbers).
-                    # Instead, treat follow-ups as the max follow_up_number we've successfully sent.
-                    last_follow_up_number = self.session.query(func.max(EmailRecord.follow_up_number)).filter_by(
-                        job_application_id=app.id,
-                        is_follow_up=True,
-                        status=EmailStatus.SENT
-                    ).scalar() or 0
-                    
-                    if last_follow_up_number < Config.MAX_FOLLOW_UPS:
-                        needing_follow_up.append(app)
-        
-        return needing_follow_up
+            ]),
+            EmailRecord.status == EmailStatus.SENT
+        ).group_by(
+            JobApplication.id
+        ).having(
+            func.max(EmailRecord.sent_at) < cutoff_date,
+            last_follow_up_number < Config.MAX_FOLLOW_UPS
+        ).order_by(JobApplication.id).all()
     
     def get_next_follow_up_number(self, job_application_id: int) -> int:
         """Get the next follow-up number for a job application."""
@@ -266,34 +364,29 @@ class ApplicationTracker:
         """
         stats = {"applications_scanned": 0, "applications_changed": 0, "rows_updated": 0}
 
-        app_ids = [
-            row[0]
-            for row in self.session.query(EmailRecord.job_application_id)
-            .filter_by(is_follow_up=True, status=EmailStatus.SENT)
-            .distinct()
-            .all()
-        ]
-
-        for app_id in app_ids:
-            stats["applications_scanned"] += 1
-
-            # Distinct follow-up numbers ordered by the first time they were sent.
-            waves = (
-                self.session.query(
-                    EmailRecord.follow_up_number,
-                    func.min(EmailRecord.sent_at).label("first_sent_at"),
-                )
-                .filter_by(job_application_id=app_id, is_follow_up=True, status=EmailStatus.SENT)
-                .filter(EmailRecord.follow_up_number > 0)
-                .group_by(EmailRecord.follow_up_number)
-                .order_by(func.min(EmailRecord.sent_at).asc())
-                .all()
+        # Distinct follow-up numbers of every application (with their row counts), ordered
+        # by the first time they were sent, in one grouped query instead of one per application.
+        waves_by_app: Dict[int, List[Tuple[int, int]]] = {}
+        waves = (
+            self.session.query(
+                EmailRecord.job_application_id,
+                EmailRecord.follow_up_number,
+                func.count().label("rows"),
             )
+            .filter_by(is_follow_up=True, status=EmailStatus.SENT)
+            .group_by(EmailRecord.job_application_id, EmailRecord.follow_up_number)
+            .order_by(EmailRecord.job_application_id, func.min(EmailRecord.sent_at).asc())
+        )
+        for wave in waves:
+            # Every application with a sent follow-up counts as scanned; only numbered waves are renumbered
+            app_waves = waves_by_app.setdefault(wave.job_application_id, [])
+            if (wave.follow_up_number or 0) > 0:
+                app_waves.append((wave.follow_up_number, wave.rows))
 
-            existing_numbers = [w.follow_up_number for w in waves]
-            if not existing_numbers:
-                continue
+        stats["applications_scanned"] = len(waves_by_app)
 
+        for app_id, app_waves in waves_by_app.items():
+            existing_numbers = [number for number, _ in app_waves]
             desired_numbers = list(range(1, len(existing_numbers) + 1))
             if existing_numbers == desired_numbers:
                 continue
@@ -304,21 +397,23 @@ class ApplicationTracker:
             )
             stats["applications_changed"] += 1
 
-            for old_num, new_num in mapping.items():
-                if old_num == new_num:
-                    continue
-                q = (
+            changed = {old: new for old, new in mapping.items() if old != new}
+            if dry_run:
+                stats["rows_updated"] += sum(rows for number, rows in app_waves if number in changed)
+            else:
+                # One CASE update renumbers every wave at once; sequential per-number updates
+                # could move a wave onto a number another wave still had to be moved from.
+                # "fetch" also updates records already loaded in this session, which would
+                # otherwise keep their old numbers (the session does not expire on commit)
+                stats["rows_updated"] += (
                     self.session.query(EmailRecord)
                     .filter_by(job_application_id=app_id, is_follow_up=True, status=EmailStatus.SENT)
-                    .filter(EmailRecord.follow_up_number == old_num)
-                )
-                if dry_run:
-                    stats["rows_updated"] += q.count()
-                else:
-                    stats["rows_updated"] += q.update(
-                        {EmailRecord.follow_up_number: new_num},
-                        synchronize_session=False,
+                    .filter(EmailRecord.follow_up_number.in_(changed))
+                    .update(
+                        {EmailRecord.follow_up_number: case(changed, value=EmailRecord.follow_up_number)},
+                        synchronize_session="fetch",
                     )
+                )
 
         if not dry_run:
             self.session.commit()
@@ -332,28 +427,37 @@ class ApplicationTracker:
         notes: Optional[str] = None
     ):
         """Update job application status."""
-        app = self.session.query(JobApplication).get(job_application_id)
+        self._set_job_status(job_application_id, status, notes)
+        self.session.commit()
+        logger.info(f"Updated job application {job_application_id} status to {status}")
+    
+    def _set_job_status(
+        self,
+        job_application_id: int,
+        status: JobStatus,
+        notes: Optional[str] = None
+    ):
+        """Apply a status change to the session without committing (the caller commits)."""
+        app = self.session.get(JobApplication, job_application_id)
         if not app:
             raise ValueError(f"Job application {job_application_id} not found")
         
+        now = datetime.now(timezone.utc)
         app.status = status
-        app.updated_at = datetime.now(timezone.utc)
+        app.updated_at = now
         
         if notes:
             app.notes = notes
         
         if status == JobStatus.CLOSED:
-            app.closed_at = datetime.now(timezone.utc)
+            app.closed_at = now
         elif status == JobStatus.INTERVIEW_SCHEDULED:
             app.status = JobStatus.INTERVIEW_SCHEDULED
-        
-        self.session.commit()
-        logger.info(f"Updated job application {job_application_id} status to {status}")
     
     def record_response(
         self,
         job_application_id: int,
-        response_type: str,
+        response_type: str,  # ResponseType or its string value
         response_text: Optional[str] = None,
         email_record_id: Optional[int] = None
     ):
@@ -368,28 +472,28 @@ class ApplicationTracker:
         
         self.session.add(response)
         
-        # Update job status based on response type
-        if response_type == 'positive' or response_type == 'interview_request':
-            self.update_job_status(job_application_id, JobStatus.INTERVIEW_SCHEDULED)
-        elif response_type == 'negative':
-            self.update_job_status(job_application_id, JobStatus.REJECTED)
+        # Update job status based on response type, committed together with the response
+        if response_type in _INTERVIEW_RESPONSES:
+            self._set_job_status(job_application_id, JobStatus.INTERVIEW_SCHEDULED)
+        elif response_type == ResponseType.NEGATIVE:
+            self._set_job_status(job_application_id, JobStatus.REJECTED)
         
         self.session.commit()
         logger.info(f"Recorded response for job application {job_application_id}: {response_type}")
     
     def get_statistics(self) -> dict:
         """Get application statistics."""
-        total_apps = self.session.query(JobApplication).count()
-        by_status = {}
-        for status in JobStatus:
-            count = self.session.query(JobApplication).filter_by(status=status).count()
-            by_status[status.value] = count
-        
-        total_emails = self.session.query(EmailRecord).filter_by(status=EmailStatus.SENT).count()
-        follow_ups = self.session.query(EmailRecord).filter_by(
-            is_follow_up=True,
-            status=EmailStatus.SENT
-        ).count()
+        # One grouped scan per table instead of a COUNT query per status
+        status_counts = dict(
+            self.session.query(JobApplication.status, func.count()).group_by(JobApplication.status)
+        )
+        total_apps = sum(status_counts.values())
+        by_status = {status.value: status_counts.get(status, 0) for status in JobStatus}
+        
+        total_emails, follow_ups = self.session.query(
+            func.count(),
+            func.count().filter(EmailRecord.is_follow_up.is_(True))
+        ).filter(EmailRecord.status == EmailStatus.SENT).one()
         
         return {
             'total_applications': total_apps,